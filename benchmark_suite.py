@@ -0,0 +1,136 @@
+"""This file is part of MORA
+
+This runnable script runs MORA on all benchmarks for several goals and records wall time, peak memory and the number
+of solved monomials. The results can be stored as JSON baseline and compared against an earlier baseline, in which
+case the script exits with a non-zero status if any regressions are found.
+For the command line arguments run the script with "--help".
+"""
+import glob
+import sys
+from argparse import ArgumentParser
+from mora.core import SOLVER_SUMMATION, SOLVER_LINEAR
+from mora.runner import STATUS_OK
+from mora.suite import run_suite, save_baseline, load_baseline, compare_to_baseline, DEFAULT_THRESHOLD, \
+    DEFAULT_MIN_TIME, DEFAULT_MIN_MEMORY
+
+parser = ArgumentParser(description="Track the performance of MORA on the benchmarks")
+
+parser.add_argument(
+    "--benchmarks",
+    dest="benchmarks",
+    type=str,
+    nargs="+",
+    default=["benchmarks/*", "benchmarks_bns/*"],
+    help="A list of benchmarks to run MORA on"
+)
+
+parser.add_argument(
+    "--goals",
+    dest="goals",
+    type=int,
+    nargs="+",
+    default=[1, 2, 3],
+    help="A list of moments MORA should consider"
+)
+
+parser.add_argument(
+    "--solver",
+    dest="solver",
+    type=str,
+    choices=[SOLVER_SUMMATION, SOLVER_LINEAR],
+    default=SOLVER_SUMMATION,
+    help="The backend MORA should use to solve the recurrences of the moments (linear is an alias of summation)"
+)
+
+parser.add_argument(
+    "--jobs",
+    dest="jobs",
+    type=int,
+    default=1,
+    help="The number of (benchmark, goal) pairs to run at the same time, use 1 for the most reliable timings"
+)
+
+parser.add_argument(
+    "--timeout",
+    dest="timeout",
+    type=float,
+    default=300,
+    help="The maximal time in seconds a single (benchmark, goal) pair may take"
+)
+
+parser.add_argument(
+    "--memory_limit",
+    dest="memory_limit",
+    type=int,
+    default=None,
+    help="The maximal memory in MB a single (benchmark, goal) pair may use"
+)
+
+parser.add_argument(
+    "--save",
+    dest="save",
+    type=str,
+    default=None,
+    help="A JSON file the results get stored in as new baseline"
+)
+
+parser.add_argument(
+    "--compare",
+    dest="compare",
+    type=str,
+    default=None,
+    help="A JSON baseline the results get compared against"
+)
+
+parser.add_argument(
+    "--threshold",
+    dest="threshold",
+    type=float,
+    default=DEFAULT_THRESHOLD,
+    help="The relative increase of time or memory which counts as regression"
+)
+
+parser.add_argument(
+    "--min_time",
+    dest="min_time",
+    type=float,
+    default=DEFAULT_MIN_TIME,
+    help="Slowdowns of less seconds than this are ignored"
+)
+
+parser.add_argument(
+    "--min_memory",
+    dest="min_memory",
+    type=float,
+    default=DEFAULT_MIN_MEMORY,
+    help="Memory growths of less MB than this are ignored"
+)
+
+
+def main():
+    args = parser.parse_args()
+    benchmarks = sorted(b for bs in map(glob.glob, args.benchmarks) for b in bs if not b.endswith(".xlsx"))
+
+    results = run_suite(benchmarks, args.goals, args.jobs, args.timeout, args.memory_limit, solver=args.solver)
+    for key, result in results.items():
+        line = f"{key:40} {result['status']:8} {result['time']:8.2f}s {result['peak_memory']:8.1f}MB"
+        if result["status"] == STATUS_OK:
+            line += f" {result['monomials']} monomials"
+        print(line)
+
+    if args.save:
+        save_baseline(args.save, results, goals=args.goals, solver=args.solver, timeout=args.timeout)
+        print(f"Baseline written to {args.save}")
+
+    if args.compare:
+        regressions = compare_to_baseline(load_baseline(args.compare), results, args.threshold, args.min_time,
+                                          args.min_memory)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions with respect to {args.compare}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,25 @@
 # gui
 
+import queue
+import threading
 from tkinter import filedialog
 import tkinter as tk
-from mora.mora import mora
+from timeit import default_timer as timer
+from mora.core import Session, AnalysisCancelled
+from mora.input import InputParser
+from mora.output import output_results
+
+# How often the event loop checks for events of the analysis thread
+POLL_INTERVAL_MS = 50
+
+# The session of the last analysis, whose unaffected results get reused after the program is edited
+session = None
+# The cancellation event of the running analysis, None if no analysis is running
+cancel_event = None
+# Events sent from the analysis thread to the event loop, as Tk widgets must only be used from the main thread
+events = queue.Queue()
+# The moments solved so far by the running analysis
+partial_moments = []
 
 root=tk.Tk()
 
@@ -37,19 +54,82 @@ goal.insert(10, "1")
 goal.grid(row=goalrow, column=1)
 
 
+def analyze(source, goal_power, cancel):
+    """
+    Runs MORA in a background thread and reports every solved moment and the final result through the event queue
+    """
+    global session
+    try:
+        parser = InputParser()
+        parser.set_source(source)
+        program = parser.parse_source()
+        new_session = Session(program)
+        if session is not None:
+            new_session.reuse(session)
+        new_session.on_solution = lambda monomial, solution: events.put(("moment", f" E[{monomial}] = {solution}"))
+        # Results of cancelled or failed runs are valid as well and get reused by the next run
+        session = new_session
+        start = timer()
+        moments = new_session.solve_goals(None, goal_power, cancel_event=cancel)
+        out = output_results(program, moments, timer() - start, "text")
+        events.put(("done", "\n".join(out)))
+    except AnalysisCancelled:
+        events.put(("stopped", "Cancelled"))
+    except Exception as exception:
+        events.put(("stopped", f"Execution failed!\n{exception}"))
+
+
 def runmora():
-    global text
-    t = text.get("1.0", "end-1c")
-    g = goal.get()
-    out = mora(t, goal=g ,output_format="text")
-    out = "\n".join(out)
-    print(out)
-    label.config(text=out)
+    global cancel_event, partial_moments
+    if cancel_event is not None:
+        return
+    try:
+        goal_power = int(goal.get())
+        if goal_power < 1:
+            raise ValueError
+    except ValueError:
+        label.config(text="The goal must be a positive integer")
+        return
+    cancel_event = threading.Event()
+    partial_moments = []
+    label.config(text="Running...")
+    buttonM.config(state=tk.DISABLED)
+    buttonC.config(state=tk.NORMAL)
+    source = text.get("1.0", "end-1c")
+    threading.Thread(target=analyze, args=(source, goal_power, cancel_event), daemon=True).start()
+
+
+def cancelmora():
+    if cancel_event is not None:
+        cancel_event.set()
+        label.config(text="\n".join(partial_moments + ["Cancelling..."]))
+
+
+def poll_events():
+    global cancel_event
+    while not events.empty():
+        kind, message = events.get()
+        if kind == "moment":
+            partial_moments.append(message)
+            label.config(text="\n".join(partial_moments + [f"Running... ({len(partial_moments)} moments solved)"]))
+        else:
+            if kind == "stopped":
+                message = "\n".join(partial_moments + [message])
+            label.config(text=message)
+            cancel_event = None
+            buttonM.config(state=tk.NORMAL)
+            buttonC.config(state=tk.DISABLED)
+    root.after(POLL_INTERVAL_MS, poll_events)
+
+
 buttonM=tk.Button(mora_frame, text="MORA", command=runmora)
 buttonM.grid(row=2)
+buttonC=tk.Button(mora_frame, text="Cancel", command=cancelmora, state=tk.DISABLED)
+buttonC.grid(row=2, column=1)
 
-label = tk.Label(mora_frame)
-label.grid(row=3)
+label = tk.Label(mora_frame, justify=tk.LEFT)
+label.grid(row=3, columnspan=2)
 label.config(text="")
 
+root.after(POLL_INTERVAL_MS, poll_events)
 root.mainloop()
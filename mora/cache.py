@@ -0,0 +1,142 @@
+"""This file is part of MORA
+
+This file contains a persistent on-disk cache for recurrences and closed form solutions of monomials.
+Entries are keyed by a fingerprint of the normalized program together with the monomial, such that repeated
+runs on the same program become mostly lookups.
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from diofant import Expr, srepr, sympify
+from typing import Dict, Optional, Tuple
+from .constants import DEFAULT_CACHE_PATH, DEFAULT_CACHE_SIZE
+
+# Number of lookups after which the recorded last uses get written back to the file
+FLUSH_INTERVAL = 1000
+# Fraction of the entries which gets evicted at once if the cache is full
+EVICTION_FRACTION = 10
+
+KIND_SOLUTION = "solution"
+KIND_RECURRENCE = "recurrence"
+
+
+def program_fingerprint(program) -> str:
+    """
+    Returns a hash of the normalized program, i.e. of its initial values and its updates (in order)
+    """
+    lines = []
+    for variable in sorted(program.initial_values.keys(), key=str):
+        lines.append(f"init {variable} {normalize_update(program.initial_values[variable])}")
+    for variable, update in program.updates.items():
+        lines.append(f"update {variable} {normalize_update(update)}")
+    return hashlib.sha256("\n".join(lines).encode()).hexdigest()
+
+
+def normalize_update(update) -> str:
+    if update.is_random_var:
+        return f"RV({update.random_var.distribution}, {srepr(update.random_var.parameters)})"
+    return srepr(update.branches)
+
+
+class SolutionCache:
+    """
+    A content-addressed cache stored in a sqlite file. If the cache grows beyond max_entries the least recently
+    used entries get evicted in chunks. Lookups only record their time of use in memory, which gets written back
+    with the next insert, every FLUSH_INTERVAL lookups and on close. The cache can be shared by sessions running
+    in different threads.
+    """
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, max_entries: int = DEFAULT_CACHE_SIZE):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.__lock = threading.Lock()
+        self.__connection = sqlite3.connect(path, check_same_thread=False)
+        self.__connection.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "program TEXT, kind TEXT, monomial TEXT, value TEXT, last_used REAL, "
+            "PRIMARY KEY (program, kind, monomial))"
+        )
+        self.__connection.execute("CREATE INDEX IF NOT EXISTS entries_last_used ON entries (last_used)")
+        self.__connection.commit()
+        self.__entries = self.__count()
+        self.__used: Dict[Tuple[str, str, str], float] = {}
+
+    def get(self, fingerprint: str, kind: str, monomial: Expr) -> Optional[Expr]:
+        key = (fingerprint, kind, srepr(monomial))
+        with self.__lock:
+            row = self.__connection.execute(
+                "SELECT value FROM entries WHERE program = ? AND kind = ? AND monomial = ?", key
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.__used[key] = time.time()
+            if len(self.__used) >= FLUSH_INTERVAL:
+                self.__flush()
+                self.__connection.commit()
+        return sympify(row[0])
+
+    def put(self, fingerprint: str, kind: str, monomial: Expr, value: Expr):
+        key = (fingerprint, kind, srepr(monomial))
+        with self.__lock:
+            self.__used.pop(key, None)
+            updated = self.__connection.execute(
+                "UPDATE entries SET value = ?, last_used = ? WHERE program = ? AND kind = ? AND monomial = ?",
+                (srepr(value), time.time(), *key)
+            ).rowcount
+            if not updated:
+                self.__connection.execute(
+                    "INSERT INTO entries VALUES (?, ?, ?, ?, ?)", (*key, srepr(value), time.time())
+                )
+                self.__entries += 1
+                if self.__entries > self.max_entries:
+                    self.__evict()
+            self.__flush()
+            self.__connection.commit()
+
+    def __len__(self):
+        with self.__lock:
+            return self.__entries
+
+    def __count(self):
+        return self.__connection.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def __flush(self):
+        """
+        Writes the recorded last uses back, without committing them
+        """
+        if self.__used:
+            self.__connection.executemany(
+                "UPDATE entries SET last_used = ? WHERE program = ? AND kind = ? AND monomial = ?",
+                [(used, *key) for key, used in self.__used.items()]
+            )
+            self.__used.clear()
+
+    def __evict(self):
+        """
+        Evicts the least recently used entries, such that a fraction of the cache is free again
+        """
+        self.__flush()
+        # Other processes might share the file, so the entries get counted once before evicting
+        self.__entries = self.__count()
+        overflow = self.__entries - (self.max_entries - self.max_entries // EVICTION_FRACTION)
+        if overflow > 0:
+            self.__connection.execute(
+                "DELETE FROM entries WHERE rowid IN (SELECT rowid FROM entries ORDER BY last_used, rowid LIMIT ?)",
+                (overflow,)
+            )
+            self.__entries -= overflow
+
+    def close(self):
+        with self.__lock:
+            self.__flush()
+            self.__connection.commit()
+            self.__connection.close()
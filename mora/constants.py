@@ -0,0 +1,15 @@
+"""This file is part of MORA
+
+This file contains the names and default paths shared by the modules of MORA and the runnable scripts. It must not
+import anything heavy, such that scripts can build their command line interface without loading diofant.
+"""
+
+# Available backends for solving the recurrences of E-variables. "linear" is kept as an alias of "summation", which
+# solves every recurrence of exponential polynomial shape in closed form as well
+SOLVER_SUMMATION = "summation"
+SOLVER_LINEAR = "linear"
+
+DEFAULT_CACHE_PATH = "out/cache.sqlite"
+DEFAULT_CACHE_SIZE = 100000
+DEFAULT_PROFILE_PATH = "out/profile"
+DEFAULT_STREAM_PATH = "out/results.jsonl"
@@ -1,6 +1,15 @@
-from diofant import Symbol, sympify, simplify, expand, Expr, Poly, symbols, summation
+from diofant import Symbol, sympify, simplify, expand, Expr, symbols, summation, srepr
 from mora.utils import *
-from typing import List, Dict, Set
+from mora.exppoly import ExpPoly, to_exppoly, sum_recurrence
+from mora.cache import SolutionCache, program_fingerprint, normalize_update, KIND_SOLUTION, KIND_RECURRENCE
+from mora.profiler import phase, record_size, record_lookup
+from mora.output import ResultStream
+from mora.plan import MonomialPlan, PlanLimitExceeded
+from mora.constants import SOLVER_SUMMATION, SOLVER_LINEAR
+from typing import List, Dict, Set, Iterable, Tuple, Optional, Callable
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+import threading
+import time
 
 
 class Program:
@@ -10,94 +19,774 @@ class Program:
         self.variables: List[Symbol] = []
         self.initial_values: Dict[Symbol, Update] = {}
         self.updates: Dict[Symbol, Update] = {}
-        self.ancestors: Dict[Symbol, Set[Symbol]] = {}
-        self.dependencies: Dict[Symbol, Set[Symbol]] = {}
+        # Variables are indexed by their position, ancestors and dependencies are bitmasks over these indices
+        self.variable_indices: Dict[Symbol, int] = {}
+        self.ancestors: Dict[Symbol, int] = {}
+        self.dependencies: Dict[Symbol, int] = {}
 
 
-# Stores the solutions of E-variables
-solution_store = {}
+# How often in seconds the solving of monomials in worker processes checks for cancellation
+CANCEL_POLL_INTERVAL = 0.5
 
-# Stores the recurrences of E-variables
-recurrence_store = {}
 
+class AnalysisCancelled(Exception):
+    pass
 
-def core(program: Program, goal_monomials: List[Expr] = None, goal_power: int = 1):
+
+class Session:
+    """
+    The state of the analysis of a program: its stores, its configuration and the statistics of solved monomials.
+    The functions of this module work on the current session of the calling thread, which is the innermost session
+    entered with "with session:" or otherwise the session last started by the thread with start_session. Separate
+    sessions can be used by parallel threads and kept across calls to reuse their results. A session can only be
+    entered by one thread at a time, other threads wait until it is left.
+    """
+
+    def __init__(self, program: Program = None, solver: str = SOLVER_SUMMATION, cache: SolutionCache = None,
+                 jobs: int = 1, stream: ResultStream = None):
+        self.program: Program = program
+        # The backend used for solving recurrences and the number of worker processes for independent monomials
+        self.solver: str = solver
+        self.jobs: int = jobs
+        # Optional persistent cache of solutions and recurrences together with the fingerprint of the program
+        self.cache: SolutionCache = cache
+        self.fingerprint: str = None
+        if program is not None and (cache is not None or stream is not None):
+            self.fingerprint = program_fingerprint(program)
+        # Optional stream every solution gets written to as soon as it is stored
+        self.stream: ResultStream = stream
+        # Optional callback getting the monomial and the solution of every solved monomial as soon as it is stored
+        self.on_solution: Optional[Callable[[Expr, Expr], None]] = None
+
+        # Stores the solutions of E-variables, keyed by their monomials
+        self.solution_store: Dict[Monomial, Expr] = {}
+        # Stores the solutions of E-variables as exponential polynomials, i.e. (coefficient, degree, base) triples,
+        # or None for solutions which are not of this shape. Entries are derived from the solution store when needed.
+        self.exppoly_store: Dict[Monomial, Optional[ExpPoly]] = {}
+        # Stores the solutions of E-variables with n replaced by some expression, e.g. n+1 for resolving
+        # placeholders, keyed by their monomials and the expression
+        self.shifted_solution_store: Dict[Tuple[Monomial, Expr], Expr] = {}
+        # Stores the recurrences of E-variables as sparse polynomials, keyed by their monomials
+        self.recurrence_store: Dict[Monomial, Dict[Monomial, Expr]] = {}
+        # Maps the placeholder symbols created so far to their monomials
+        self.placeholder_store: Dict[Symbol, Monomial] = {}
+        # The placeholder symbol of every monomial, such that placeholders only get built once
+        self.placeholder_symbols: Dict[Monomial, Symbol] = {}
+        # The expression of every monomial over the program variables, such that it only gets built once
+        self.monomial_exprs: Dict[Monomial, Expr] = {}
+        # Stores the expected values of powers of variable updates as sparse polynomials, keyed by (variable, power)
+        self.update_power_store: Dict[Tuple[Symbol, int], Dict[Monomial, Expr]] = {}
+
+        # The time the last solution was stored and for every solved monomial the time since the solution before
+        self.last_solution_time: float = time.perf_counter()
+        self.solution_times: Dict[Monomial, float] = {}
+        self.lock = threading.RLock()
+        # While goals get solved with a timeout or a cancellation event, the deadline and the event
+        self.deadline: Optional[float] = None
+        self.cancel_event: Optional[threading.Event] = None
+
+    def __enter__(self):
+        self.lock.acquire()
+        get_session_stack().append(self)
+        return self
+
+    def __exit__(self, *exc_info):
+        get_session_stack().pop()
+        self.lock.release()
+
+    def solve_goals(self, goal_monomials: List[Expr] = None, goal_power: int = 1, timeout: float = None,
+                    cancel_event: threading.Event = None) -> Dict[Expr, Expr]:
+        """
+        Solves the given goals within the session. Raises AnalysisCancelled if the timeout (in seconds) expires or
+        the given event gets set. Both are checked before every monomial, results of solved monomials are kept.
+        Waiting for another thread to leave the session counts against the timeout.
+        """
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        if not self.lock.acquire(timeout=-1 if timeout is None else timeout):
+            raise AnalysisCancelled("The analysis timed out")
+        try:
+            with self:
+                self.deadline = deadline
+                self.cancel_event = cancel_event
+                try:
+                    return solve_goals(self.program, goal_monomials, goal_power)
+                finally:
+                    self.deadline = None
+                    self.cancel_event = None
+        finally:
+            self.lock.release()
+
+    def plan_goals(self, goal_monomials: List[Expr] = None, goal_power: int = 1,
+                   max_monomials: int = None) -> MonomialPlan:
+        with self:
+            return plan_goals(self.program, goal_monomials, goal_power, max_monomials)
+
+    def get_monomial_stats(self, monomials: Iterable[Expr] = None) -> Dict[Expr, dict]:
+        with self:
+            return get_monomial_stats(self.program, monomials)
+
+    def update(self, program: Program) -> "Session":
+        """
+        Returns a session for an edited version of the program with the same configuration, which reuses all results
+        not affected by the edits
+        """
+        session = Session(program, self.solver, self.cache, self.jobs, self.stream)
+        session.reuse(self)
+        return session
+
+    def reuse(self, previous: "Session"):
+        """
+        Copies all results of a previous session for another version of the program which are not affected by the
+        differences between the two programs
+        """
+        with previous, self:
+            reuse_session(self.program, previous.program, previous.solution_store, previous.recurrence_store,
+                          previous.placeholder_store, previous.update_power_store)
+
+
+# The sessions entered by every thread and the session last started by it with start_session
+thread_sessions = threading.local()
+
+
+def get_session_stack() -> List[Session]:
+    if not hasattr(thread_sessions, "stack"):
+        thread_sessions.stack = []
+    return thread_sessions.stack
+
+
+def current_session() -> Session:
+    """
+    Returns the session the functions of this module work on in the calling thread
+    """
+    stack = get_session_stack()
+    if stack:
+        return stack[-1]
+    if getattr(thread_sessions, "started", None) is None:
+        thread_sessions.started = Session()
+    return thread_sessions.started
+
+
+def core(program: Program, goal_monomials: List[Expr] = None, goal_power: int = 1, solver: str = SOLVER_SUMMATION,
+         cache: SolutionCache = None, jobs: int = 1, stream: ResultStream = None, incremental: bool = False):
     """
     Returns the expected values of given monomials raised to a given power. If no monomials are given the expected
-    values of all program variables get computed.
+    values of all program variables get computed. If incremental is true the results of the previous session which
+    are not affected by the differences between its program and the given one get reused.
     """
-    global solution_store, recurrence_store
-    solution_store = {}
-    recurrence_store = {}
+    session = start_session(program, solver, cache, jobs, stream, incremental)
+    return session.solve_goals(goal_monomials, goal_power)
+
+
+def core_goals(program: Program, goal_powers: Iterable[int], solver: str = SOLVER_SUMMATION,
+               cache: SolutionCache = None, jobs: int = 1, stream: ResultStream = None,
+               incremental: bool = False) -> Dict[int, Dict[Expr, Expr]]:
+    """
+    Returns for every given goal power the expected values of all program variables raised to it. All goals are solved
+    in one session sharing the solution and recurrence stores, such that lower moments only get computed once.
+    """
+    session = start_session(program, solver, cache, jobs, stream, incremental)
+    return {power: dict(session.solve_goals(None, power)) for power in goal_powers}
+
+
+def start_session(program: Program, solver: str = SOLVER_SUMMATION, cache: SolutionCache = None, jobs: int = 1,
+                  stream: ResultStream = None, incremental: bool = False) -> Session:
+    """
+    Starts a new session for the given program, which subsequent calls to solve_goals from the same thread share.
+    If incremental is true the solutions and recurrences of the session previously started by the thread which are
+    still valid for the given program are kept.
+    """
+    previous = getattr(thread_sessions, "started", None)
+    session = Session(program, solver, cache, jobs, stream)
+    if incremental and previous is not None and previous.program is not None:
+        session.reuse(previous)
+    thread_sessions.started = session
+    return session
+
+
+def reuse_session(program: Program, previous_program: Program, solutions: Dict[Monomial, Expr],
+                  recurrences: Dict[Monomial, Dict[Monomial, Expr]], placeholders: Dict[Symbol, Monomial],
+                  update_powers: Dict[Tuple[Symbol, int], Dict[Monomial, Expr]]):
+    """
+    Copies the entries of the stores of a previous session for another program into the current stores, if they
+    are not affected by the differences between the two programs. The recurrence and solution of a monomial only
+    depend on the updates and initial values of its variables and their ancestors, so an entry is kept iff its
+    monomial contains no affected variable.
+    """
+    session = current_session()
+    affected = get_affected_variables(program, previous_program)
+    indices = [
+        None if variable in affected else program.variable_indices[variable] for variable in previous_program.variables
+    ]
+    log(f"Variables affected by the changes: {', '.join(map(str, affected)) or 'none'}", LOG_VERBOSE)
+
+    def translate(monomial: Monomial):
+        exponents = [0] * len(program.variables)
+        for index, power in zip(indices, monomial.exponents):
+            if power > 0:
+                if index is None:
+                    return None
+                exponents[index] = power
+        return Monomial(exponents)
+
+    def translate_polynomial(polynomial: Dict[Monomial, Expr]):
+        return {translate(m): coeff for m, coeff in polynomial.items()}
+
+    for monomial, solution in solutions.items():
+        new_monomial = translate(monomial)
+        if new_monomial is not None:
+            session.solution_store[new_monomial] = solution
+    for monomial, recurrence in recurrences.items():
+        new_monomial = translate(monomial)
+        if new_monomial is not None:
+            session.recurrence_store[new_monomial] = translate_polynomial(recurrence)
+    for placeholder, monomial in placeholders.items():
+        new_monomial = translate(monomial)
+        if new_monomial is not None:
+            session.placeholder_store[placeholder] = new_monomial
+    for (variable, power), polynomial in update_powers.items():
+        if variable not in affected:
+            session.update_power_store[(variable, power)] = translate_polynomial(polynomial)
+    log(f"Reusing {len(session.solution_store)} solutions and {len(session.recurrence_store)} recurrences", LOG_VERBOSE)
+
+
+def get_affected_variables(program: Program, previous_program: Program) -> Set[Symbol]:
+    """
+    Returns the variables of a previous program whose updates or initial values differ in the given program,
+    together with their descendants. Variables which got removed count as affected as well.
+    """
+    changed = {
+        v for v in previous_program.variables
+        if v not in program.variable_indices or variable_signature(program, v) != variable_signature(previous_program, v)
+    }
+    return {
+        v for v in previous_program.variables
+        if v in changed or any(previous_program.variables[i] in changed
+                               for i in mask_to_indices(previous_program.ancestors[v]))
+    }
+
+
+def variable_signature(program: Program, variable: Symbol) -> Tuple[str, str, List[str]]:
+    """
+    Returns the normalized update and initial value of a given variable together with the variable and its ancestors
+    in program order, which determine the recurrences of all monomials of the variable
+    """
+    mask = program.ancestors[variable] | variable_mask(program, [variable])
+    ancestors = [str(program.variables[i]) for i in mask_to_indices(mask)]
+    initial_value = program.initial_values.get(variable)
+    return (
+        normalize_update(program.updates[variable]),
+        normalize_update(initial_value) if initial_value is not None else "",
+        ancestors,
+    )
+
+
+def solve_goals(program: Program, goal_monomials: List[Expr] = None, goal_power: int = 1) -> Dict[Expr, Expr]:
+    """
+    Computes the expected values of given monomials raised to a given power within the current session.
+    If no monomials are given the expected values of all program variables get computed.
+    Returns the solutions of the goal monomials and of all monomials they depend on, keyed by their monomials as
+    expressions. Solutions in the session which only other goals needed are left out.
+    """
+    session = current_session()
     if goal_monomials is None:
         goal_monomials = [v**goal_power for v in program.variables]
 
-    goal_monomials = [m.as_poly(program.variables) for m in goal_monomials]
-    solutions = {}
+    goals = []
     for m in goal_monomials:
-        solutions[m] = get_solution(program, m)
-    return solution_store
+        m = sympify(m).as_poly(program.variables)
+        goals.append((Monomial(m.monoms()[0]), m.coeffs()[0]))
+    if session.jobs > 1:
+        with phase("solve_in_parallel"):
+            solve_in_parallel(program, [m for m, _ in goals])
+    for m, _ in goals:
+        get_solution(program, m)
+
+    needed = set(get_dependency_order(program, [m for m, _ in goals], True, set(session.solution_store)))
+    solutions = {
+        get_monomial_expr(program, m): solution for m, solution in session.solution_store.items() if m in needed
+    }
+    for m, factor in goals:
+        if factor != 1 and not m.is_constant():
+            solutions[factor * get_monomial_expr(program, m)] = factor * session.solution_store[m]
+    return solutions
+
+
+def get_monomial_stats(program: Program, monomials: Iterable[Expr] = None) -> Dict[Expr, dict]:
+    """
+    Returns for every monomial in the solution store of the current session the time it took to solve it (zero for
+    solutions loaded from a cache) and the number of terms of its recurrence. If monomials are given only their
+    stats are returned.
+    """
+    session = current_session()
+    stats = {
+        get_monomial_expr(program, m): {
+            "time": session.solution_times.get(m, 0.0),
+            "recurrence_terms": len(session.recurrence_store[m]) if m in session.recurrence_store else 0,
+        }
+        for m in session.solution_store
+    }
+    if monomials is not None:
+        stats = {m: stats[m] for m in monomials if m in stats}
+    return stats
+
+
+def solve_in_parallel(program: Program, goal_monomials: List[Monomial]):
+    """
+    Builds the dependency DAG of all monomials needed for the goal monomials and solves independent monomials in
+    parallel worker processes in topological order. Afterwards the solution store contains the same monomials as if
+    the goals were solved sequentially, in the order of a depth-first traversal from the goals.
+    """
+    session = current_session()
+    log(f"Start solve in parallel", LOG_VERBOSE)
+    plan = build_plan(program, goal_monomials)
+    dag = plan.dependencies
+    # Monomials which become ready at the same time get submitted in the order of the plan
+    position = {m: i for i, m in enumerate(plan.order)}
+    dependents = {m: [] for m in dag}
+    for m, dependencies in dag.items():
+        for dependency in dependencies:
+            dependents[dependency].append(m)
+    missing = {m: len(dependencies) for m, dependencies in dag.items()}
+    ready = [m for m, count in missing.items() if count == 0]
+    added = set()
+
+    with ProcessPoolExecutor(session.jobs, initializer=init_worker, initargs=(program, session.solver)) as pool:
+        running = {}
+        while ready or running:
+            for m in sorted(ready, key=position.get):
+                recurrence = {r.exponents: srepr(coeff) for r, coeff in session.recurrence_store[m].items()}
+                dependencies = get_dependencies(program, m)
+                solutions = {d.exponents: srepr(session.solution_store[d]) for d in dependencies}
+                running[pool.submit(solve_monomial_task, m.exponents, recurrence, solutions)] = m
+            ready = []
+            done, _ = wait(running.keys(), timeout=CANCEL_POLL_INTERVAL, return_when=FIRST_COMPLETED)
+            if not done:
+                check_cancelled(session)
+            for future in done:
+                m = running.pop(future)
+                store_solution(program, m, sympify(future.result()))
+                added.add(m)
+                for dependent in dependents[m]:
+                    missing[dependent] -= 1
+                    if missing[dependent] == 0:
+                        ready.append(dependent)
+
+    if len(added) < len(dag):
+        raise Exception("Program is not prob-solvable. Circular monomial dependencies.")
+
+    # Only keep the monomials which are needed after resolving placeholders, in the order of sequential solving
+    order = get_dependency_order(program, goal_monomials, resolved=True, include=added)
+    solutions = {m: session.solution_store.pop(m) for m in added}
+    for m in order:
+        session.solution_store[m] = solutions[m]
+    log(f"End solve in parallel", LOG_VERBOSE)
+
+
+def plan_goals(program: Program, goal_monomials: List[Expr] = None, goal_power: int = 1,
+               max_monomials: int = None) -> MonomialPlan:
+    """
+    Returns the plan of all unsolved monomials needed for the expected values of given monomials raised to a given
+    power within the current session. If no monomials are given the plan is for all program variables.
+    Only recurrences get computed for it, they stay in the recurrence store for solving the monomials later on.
+    Raises PlanLimitExceeded as soon as more than max_monomials monomials are needed.
+    """
+    if goal_monomials is None:
+        goal_monomials = [v**goal_power for v in program.variables]
+    goals = [Monomial(sympify(m).as_poly(program.variables).monoms()[0]) for m in goal_monomials]
+    with phase("plan_goals"):
+        return build_plan(program, goals, max_monomials)
+
+
+def build_plan(program: Program, goal_monomials: List[Monomial], max_monomials: int = None) -> MonomialPlan:
+    dag = build_monomial_dag(program, goal_monomials, max_monomials)
+    terms = {m: len(get_recurrence(program, m)) for m in dag}
+    return MonomialPlan(program.variables, goal_monomials, dag, terms)
+
+
+def build_monomial_dag(program: Program, goal_monomials: List[Monomial],
+                       max_monomials: int = None) -> Dict[Monomial, Set[Monomial]]:
+    """
+    Returns the dependency DAG of all unsolved monomials needed for the given goal monomials. The DAG only gets built
+    from recurrences and placeholders, hence no monomial needs to be solved for it.
+    """
+    session = current_session()
+    dag = {}
+    stack = [m for m in goal_monomials if not m.is_constant()]
+    while stack:
+        check_cancelled(session)
+        m = stack.pop()
+        if m in dag or is_solved(program, m):
+            continue
+        if max_monomials is not None and len(dag) >= max_monomials:
+            raise PlanLimitExceeded(f"The goals need more than {max_monomials} monomials")
+        dependencies = [d for d in get_dependencies(program, m) if not is_solved(program, d)]
+        dag[m] = set(dependencies)
+        stack.extend(dependencies)
+    return dag
+
+
+def init_worker(program: Program, solver: str):
+    """
+    Initializes a worker process for solving monomials of the given program
+    """
+    thread_sessions.started = Session(program, solver)
+
+
+def solve_monomial_task(monomial: Tuple[int, ...], recurrence: Dict[Tuple[int, ...], str],
+                        solutions: Dict[Tuple[int, ...], str]) -> str:
+    """
+    Solves a single monomial in a worker process given its recurrence and the solutions of all its dependencies.
+    Monomials are passed as exponent vectors. As undefined functions cannot be pickled, all expressions are passed in
+    their srepr form.
+    """
+    worker_session = current_session()
+    program = worker_session.program
+    monomial = Monomial(monomial)
+    with Session(program, worker_session.solver) as session:
+        session.solution_store = {Monomial(m): sympify(s) for m, s in solutions.items()}
+        session.recurrence_store = {monomial: {Monomial(m): sympify(c) for m, c in recurrence.items()}}
+        return srepr(compute_solution(program, monomial))
+
+
+# The stages a monomial goes through in solve_monomials
+STAGE_PLACEHOLDERS = 0
+STAGE_RECURRENCE = 1
+STAGE_SOLVE = 2
 
 
-def get_solution(program: Program, monomial: Poly):
+def get_solution(program: Program, monomial: Monomial):
     """
     For a given monomial returns its expected value by first checking if it already has been computed and stored
     """
-    log(f"Start get solution, { monomial.as_expr() }", LOG_VERBOSE)
-    global solution_store
-    if monomial_is_constant(monomial):
-        return monomial.as_expr()
-    if monomial.as_expr() not in solution_store:
-        solution_store[monomial.as_expr()] = compute_solution(program, monomial)
-    log(f"End get solution, { monomial.as_expr() }", LOG_VERBOSE)
-    return solution_store[monomial.as_expr()]
+    session = current_session()
+    log(f"Start get solution, { get_monomial_expr(program, monomial) }", LOG_VERBOSE)
+    if monomial.is_constant():
+        return sympify(1)
+    if not is_solved(program, monomial):
+        solve_monomials(program, monomial)
+    log(f"End get solution, { get_monomial_expr(program, monomial) }", LOG_VERBOSE)
+    return session.solution_store[monomial]
 
 
-def compute_solution(program: Program, monomial: Poly):
+def solve_monomials(program: Program, goal: Monomial):
+    """
+    Solves a given monomial together with all unsolved monomials it depends on, using an explicit work stack instead
+    of recursion. A monomial on the stack first waits for the monomials of the placeholders in its recurrence, then
+    for the monomials of its resolved recurrence and finally gets solved, after which its resolved recurrence is
+    released. The monomials get solved in the same order as by a depth-first traversal.
+    """
+    session = current_session()
+    stages: Dict[Monomial, int] = {}
+    resolved_recurrences: Dict[Monomial, Dict[Monomial, Expr]] = {}
+    stack = [goal]
+    while stack:
+        monomial = stack[-1]
+        if monomial.is_constant() or monomial not in stages and is_solved(program, monomial):
+            stack.pop()
+            continue
+        check_cancelled(session)
+        stage = stages.get(monomial, STAGE_PLACEHOLDERS)
+        with phase("get_solution", get_monomial_expr(program, monomial)):
+            if stage == STAGE_PLACEHOLDERS:
+                dependencies = get_placeholder_monomials(program, get_recurrence(program, monomial))
+            elif stage == STAGE_RECURRENCE:
+                resolved_recurrences[monomial] = get_resolved_recurrence(program, monomial)
+                dependencies = [m for m in resolved_recurrences[monomial] if m != monomial]
+            else:
+                recurrence = resolved_recurrences.pop(monomial)
+                solution = compute_solution(program, monomial, recurrence)
+                store_solution(program, monomial, solution)
+                del stages[monomial]
+                stack.pop()
+                continue
+        stages[monomial] = stage + 1
+        for dependency in reversed(dependencies):
+            if dependency in stages:
+                raise Exception("Program is not prob-solvable. Circular monomial dependencies.")
+            # Every infinite chain of dependencies contains a monomial and a proper multiple of it (Dickson's lemma)
+            divisor = next((m for m in stages if dependency.is_multiple_of(m)), None)
+            if divisor is not None:
+                raise Exception(f"Program is not prob-solvable. E[{get_monomial_expr(program, divisor)}] depends on "
+                                f"E[{get_monomial_expr(program, dependency)}].")
+            stack.append(dependency)
+
+
+def check_cancelled(session: Session):
     """
-    For a given monomial returns its expected value by constructing and solving a recurrence relation
+    Raises AnalysisCancelled if the deadline of the given session passed or its cancellation event is set
     """
-    log(f"Start compute solution, { monomial.as_expr() }", LOG_VERBOSE)
-    if monomial_is_constant(monomial):
-        return monomial.as_expr()
+    if session.cancel_event is not None and session.cancel_event.is_set():
+        raise AnalysisCancelled("The analysis got cancelled")
+    if session.deadline is not None and time.monotonic() > session.deadline:
+        raise AnalysisCancelled("The analysis timed out")
 
-    factor = monomial.coeffs()[0]
-    monomial = monomial.monic()
-    recurrence = get_recurrence(program, monomial)
-    recurr_coeff = recurrence.coeff_monomial(monomial.as_expr())
-    inhom_part = recurrence - (recurr_coeff * monomial)
-    inhom_part_solution = get_inhom_part_solution(program, inhom_part)
+
+def is_solved(program: Program, monomial: Monomial):
+    """
+    Returns true iff the solution of the given monomial is in the solution store. Solutions which are found in the
+    persistent cache or in the records of a resumed result stream get loaded into the solution store.
+    """
+    session = current_session()
+    if monomial in session.solution_store:
+        record_lookup("solution_store", True)
+        return True
+    record_lookup("solution_store", False)
+    if session.cache is not None:
+        solution = session.cache.get(session.fingerprint, KIND_SOLUTION, get_monomial_expr(program, monomial))
+        record_lookup("solution_cache", solution is not None)
+        if solution is not None:
+            session.solution_store[monomial] = solution
+            return True
+    if session.stream is not None:
+        solution = session.stream.get(session.fingerprint, get_monomial_expr(program, monomial))
+        if solution is not None:
+            session.solution_store[monomial] = solution
+            return True
+    return False
+
+
+def store_solution(program: Program, monomial: Monomial, solution: Expr):
+    """
+    Stores the solution of a given monomial in the solution store, the persistent cache and the result stream and
+    passes it to the callback of the session. The time recorded in the stream is the time since the previous solution
+    was stored.
+    """
+    session = current_session()
+    now = time.perf_counter()
+    session.solution_store[monomial] = solution
+    session.solution_times[monomial] = now - session.last_solution_time
+    session.last_solution_time = now
+    if session.cache is not None:
+        session.cache.put(session.fingerprint, KIND_SOLUTION, get_monomial_expr(program, monomial), solution)
+    if session.stream is not None:
+        session.stream.write(
+            program.name, session.fingerprint, get_monomial_expr(program, monomial), solution,
+            session.solution_times[monomial]
+        )
+    if session.on_solution is not None:
+        session.on_solution(get_monomial_expr(program, monomial), solution)
+
+
+def compute_solution(program: Program, monomial: Monomial, recurrence: Dict[Monomial, Expr] = None):
+    """
+    For a given monomial returns its expected value by constructing and solving a recurrence relation, assuming all
+    monomials the recurrence depends on are already solved. The resolved recurrence can be given if it is known.
+    If the recurrence is of exponential polynomial shape it gets solved in closed form from the table of power sums,
+    otherwise by symbolic summation.
+    """
+    session = current_session()
+    log(f"Start compute solution, { get_monomial_expr(program, monomial) }", LOG_VERBOSE)
+    if monomial.is_constant():
+        return sympify(1)
+
+    if recurrence is None:
+        recurrence = get_resolved_recurrence(program, monomial)
+    recurr_coeff = recurrence.get(monomial, sympify(0))
+    with phase("get_inhom_part_exppoly"):
+        inhom_part_exppoly = get_inhom_part_exppoly(program, monomial, recurrence)
+    if inhom_part_exppoly is not None:
+        initial_value = get_expected_initial_value(program, monomial)
+        with phase("sum_recurrence"):
+            solution = sum_recurrence(recurr_coeff, inhom_part_exppoly, initial_value)
+        session.exppoly_store[monomial] = solution
+        log(f"End compute solution, { get_monomial_expr(program, monomial) }", LOG_ESSENTIAL)
+        return solution.as_expr()
+
+    n = symbols('n', integer=True, positive=True)
+    k = symbols('_k', integer=True, positive=True)
+    inhom_part = {m: coeff for m, coeff in recurrence.items() if m != monomial}
+    with phase("get_inhom_part_solution"):
+        inhom_part_solution = get_inhom_part_solution(program, inhom_part)
+        shifted_inhom_part = get_inhom_part_solution(program, inhom_part, (n-1) - k)
+        record_size(inhom_part_solution)
     initial_value = get_expected_initial_value(program, monomial)
-    solution = compute_solution_for_recurrence(recurr_coeff, inhom_part_solution, initial_value)
-    log(f"End compute solution, { monomial.as_expr() }", LOG_ESSENTIAL)
-    return factor * solution
+    solution = compute_solution_for_recurrence(recurr_coeff, inhom_part_solution, initial_value, shifted_inhom_part)
+    log(f"End compute solution, { get_monomial_expr(program, monomial) }", LOG_ESSENTIAL)
+    return solution
+
+
+def get_dependencies(program: Program, monomial: Monomial, resolved: bool = False) -> List[Monomial]:
+    """
+    Returns all monomials (other than the given one) whose solutions are needed to solve the recurrence of
+    the given monomial. If resolved is true, the placeholders in the recurrence get solved first, otherwise they
+    count as dependencies themselves. In the latter case no solving is needed, but the result may contain monomials
+    whose coefficients vanish after resolving.
+    """
+    recurrence = get_recurrence(program, monomial)
+    placeholder_monomials = get_placeholder_monomials(program, recurrence)
+    if resolved:
+        recurrence = get_resolved_recurrence(program, monomial)
+    dependencies = {}
+    for m in placeholder_monomials + [m for m in recurrence if not m.is_constant()]:
+        if m != monomial:
+            dependencies[m] = m
+    return list(dependencies)
+
+
+def get_dependency_order(program: Program, monomials: List[Monomial], resolved: bool = False,
+                         include: Set[Monomial] = None) -> List[Monomial]:
+    """
+    Returns the given monomials and all monomials they transitively depend on (see get_dependencies) in depth-first
+    post-order, such that every monomial comes after its dependencies. If include is given only the monomials in it
+    are traversed. The traversal uses an explicit stack, hence long dependency chains do not hit the recursion limit.
+    """
+    order = []
+    visited = set()
+    in_progress = set()
+    stack = [(m, False) for m in reversed(monomials)]
+    while stack:
+        m, finished = stack.pop()
+        if finished:
+            in_progress.remove(m)
+            visited.add(m)
+            order.append(m)
+            continue
+        if m in visited or m.is_constant() or include is not None and m not in include:
+            continue
+        if m in in_progress:
+            raise Exception("Program is not prob-solvable. Circular monomial dependencies.")
+        in_progress.add(m)
+        stack.append((m, True))
+        stack.extend((d, False) for d in reversed(get_dependencies(program, m, resolved)))
+    return order
+
+
+def get_monomial_expr(program: Program, monomial: Monomial) -> Expr:
+    """
+    Returns the expression of a given monomial over the program variables
+    """
+    session = current_session()
+    expr = session.monomial_exprs.get(monomial)
+    record_lookup("monomial_exprs", expr is not None)
+    if expr is None:
+        expr = monomial.as_expr(program.variables)
+        session.monomial_exprs[monomial] = expr
+    return expr
 
 
-def get_inhom_part_solution(program: Program, inhom_part: Poly):
+def get_placeholder(program: Program, monomial: Monomial) -> Symbol:
+    """
+    Returns the symbol standing for the expected value of a given monomial in the next iteration, i.e. E[M](n+1)
+    """
+    session = current_session()
+    placeholder = session.placeholder_symbols.get(monomial)
+    record_lookup("placeholder_symbols", placeholder is not None)
+    if placeholder is None:
+        placeholder = Symbol(f"E[{get_monomial_expr(program, monomial)}]")
+        session.placeholder_symbols[monomial] = placeholder
+    session.placeholder_store[placeholder] = monomial
+    return placeholder
+
+
+def get_placeholder_monomials(program: Program, polynomial: Dict[Monomial, Expr]) -> List[Monomial]:
+    """
+    Returns the monomials of all placeholders occurring in the coefficients of a given polynomial
+    """
+    session = current_session()
+    placeholders = set()
+    for coeff in polynomial.values():
+        placeholders.update(s for s in coeff.free_symbols if s.name.startswith("E["))
+    monomials = []
+    for placeholder in sorted(placeholders, key=str):
+        if placeholder not in session.placeholder_store:
+            # Placeholders of recurrences loaded from the cache or sent to a worker are not known yet
+            variables = {str(v): v for v in program.variables}
+            monomial = sympify(placeholder.name[2:-1], locals=variables).as_poly(program.variables)
+            session.placeholder_store[placeholder] = Monomial(monomial.monoms()[0])
+        monomials.append(session.placeholder_store[placeholder])
+    return monomials
+
+
+def resolve_placeholders(program: Program, polynomial: Dict[Monomial, Expr]) -> Dict[Monomial, Expr]:
+    """
+    Replaces all placeholders in the coefficients of a given polynomial by the solutions of their monomials
+    """
+    n = symbols('n', integer=True, positive=True)
+    replacements = {
+        get_placeholder(program, m): get_shifted_solution(program, m, n+1)
+        for m in get_placeholder_monomials(program, polynomial)
+    }
+    if not replacements:
+        return polynomial
+    resolved = {}
+    for m, coeff in polynomial.items():
+        coeff = expand(coeff.xreplace(replacements))
+        if not coeff.is_zero:
+            resolved[m] = coeff
+    return resolved
+
+
+def get_shifted_solution(program: Program, monomial: Monomial, shift: Expr) -> Expr:
+    """
+    Returns the solution of a given monomial with n replaced by the given expression
+    """
+    session = current_session()
+    key = (monomial, shift)
+    record_lookup("shifted_solution_store", key in session.shifted_solution_store)
+    if key not in session.shifted_solution_store:
+        n = symbols('n', integer=True, positive=True)
+        session.shifted_solution_store[key] = get_solution(program, monomial).xreplace({n: shift})
+    return session.shifted_solution_store[key]
+
+
+def get_inhom_part_solution(program: Program, inhom_part: Dict[Monomial, Expr], shift: Expr = None):
     """
     For a given inhomogenous part of the assignment of a monomial replace the monomials in the inhom part by their
-    closed form solutions.
-    """
-    log(f"Start get inhom_part_solution, { inhom_part.as_expr() }", LOG_VERBOSE)
-    monomials = get_monoms(inhom_part)
-    result = inhom_part.coeff_monomial(1)
-    for monomial in monomials:
-        solution = get_solution(program, monomial)
-        monomial = monomial.as_expr()
-        result += inhom_part.coeff_monomial(monomial) * solution
-    log(f"End get inhom_part_solution, {inhom_part.as_expr()}", LOG_VERBOSE)
+    closed form solutions. If a shift is given, n gets replaced by it in the solutions and coefficients.
+    """
+    log(f"Start get inhom_part_solution, { terms_to_expr(inhom_part, program.variables) }", LOG_VERBOSE)
+    n = symbols('n', integer=True, positive=True)
+    result = sympify(0)
+    for monomial, coeff in inhom_part.items():
+        if shift is None:
+            result += coeff * get_solution(program, monomial)
+        else:
+            result += coeff.xreplace({n: shift}) * get_shifted_solution(program, monomial, shift)
+    log(f"End get inhom_part_solution, { terms_to_expr(inhom_part, program.variables) }", LOG_VERBOSE)
     return expand(result)
 
 
-def get_expected_initial_value(program: Program, monomial: Poly):
+def get_exppoly(monomial: Monomial) -> Optional[ExpPoly]:
+    """
+    Returns the solution of a given solved monomial as exponential polynomial or None if it is not of this shape
+    """
+    session = current_session()
+    if monomial not in session.exppoly_store:
+        session.exppoly_store[monomial] = to_exppoly(session.solution_store[monomial])
+    return session.exppoly_store[monomial]
+
+
+def get_inhom_part_exppoly(program: Program, monomial: Monomial,
+                           recurrence: Dict[Monomial, Expr]) -> Optional[ExpPoly]:
+    """
+    For the resolved recurrence of a given monomial returns its inhomogeneous part with the monomials replaced by
+    their solutions as exponential polynomial. Returns None if the recurrence is not of the form
+    f(n+1) = a * f(n) + g(n) with constant a and exponential polynomial g.
+    """
+    n = symbols('n', integer=True, positive=True)
+    if recurrence.get(monomial, sympify(0)).has(n):
+        return None
+    inhom_part = to_exppoly(recurrence.get(Monomial.constant(len(program.variables)), sympify(0)))
+    for dependency, coeff in recurrence.items():
+        if inhom_part is None:
+            return None
+        if dependency == monomial or dependency.is_constant():
+            continue
+        coeff = to_exppoly(coeff)
+        solution = get_exppoly(dependency)
+        if coeff is None or solution is None:
+            return None
+        inhom_part = inhom_part + coeff * solution
+    return inhom_part
+
+
+def get_expected_initial_value(program: Program, monomial: Monomial):
     """
     For a given monomial computes the expected initial value
     """
-    log(f"Start get expected initial value, { monomial.as_expr() }", LOG_VERBOSE)
-    powers = monomial.monoms()[0]
-    vars_with_powers = [(var, power) for var, power in zip(monomial.gens, powers)]
+    log(f"Start get expected initial value, { get_monomial_expr(program, monomial) }", LOG_VERBOSE)
     result = sympify(1)
-    for variable, power in vars_with_powers:
+    for variable, power in zip(program.variables, monomial.exponents):
         if power > 0 and variable in program.initial_values:
             if program.initial_values[variable].is_random_var:
                 # Variable initialized with RV
@@ -105,14 +794,16 @@ def get_expected_initial_value(program: Program, monomial: Poly):
             else:
                 # Variable initialized with branches
                 result *= sum([b[1] * (b[0]**power) for b in program.initial_values[variable].branches])
-    log(f"End get expected initial value, { monomial.as_expr() }", LOG_VERBOSE)
+    log(f"End get expected initial value, { get_monomial_expr(program, monomial) }", LOG_VERBOSE)
     return result
 
 
-def compute_solution_for_recurrence(recurr_coeff: Expr, inhom_part_solution: Expr, initial_value: Expr):
+def compute_solution_for_recurrence(recurr_coeff: Expr, inhom_part_solution: Expr, initial_value: Expr,
+                                    shifted_inhom_part: Expr = None):
     """
     Computes the (unique) solution to the recurrence relation:
     f(0) = initial_value; f(n+1) = recurr_coeff * f(n) + inhom_part_solution
+    The inhomogeneous part with n replaced by n-1-_k can be given if it is known.
     """
     log(f"Start compute solution for recurrence, { recurr_coeff }, { inhom_part_solution }, { initial_value }", LOG_VERBOSE)
     n = symbols('n', integer=True, positive=True)
@@ -121,107 +812,152 @@ def compute_solution_for_recurrence(recurr_coeff: Expr, inhom_part_solution: Exp
 
     hom_solution = (recurr_coeff ** n) * initial_value
     k = symbols('_k', integer=True, positive=True)
-    summand = simplify((recurr_coeff ** k) * inhom_part_solution.xreplace({n: (n-1) - k}))
-    particular_solution = summation(summand, (k, 0, (n-1)))
-    particular_solution = without_piecewise(particular_solution)
-    solution = simplify(hom_solution + particular_solution)
+    with phase("simplify"):
+        if shifted_inhom_part is None:
+            shifted_inhom_part = inhom_part_solution.xreplace({n: (n-1) - k})
+        summand = simplify((recurr_coeff ** k) * shifted_inhom_part)
+        record_size(summand)
+    with phase("summation"):
+        particular_solution = summation(summand, (k, 0, (n-1)))
+        particular_solution = without_piecewise(particular_solution)
+        record_size(particular_solution)
+    with phase("simplify"):
+        solution = simplify(hom_solution + particular_solution)
+        record_size(solution)
     log(f"End compute solution for recurrence, { recurr_coeff }, { inhom_part_solution }, { initial_value }", LOG_VERBOSE)
     return solution
 
 
-def get_recurrence(program: Program, monomial: Poly):
+def get_recurrence(program: Program, monomial: Monomial) -> Dict[Monomial, Expr]:
     """
     For a given monomial returns its recurrence representation by first checking if it already
     as been computed and stored
     """
-    log(f"Start get recurrence, { monomial.as_expr() }", LOG_VERBOSE)
-    global recurrence_store
-    if monomial_is_constant(monomial):
-        return monomial
-    if monomial.as_expr() not in recurrence_store:
-        recurrence_store[monomial.as_expr()] = compute_recurrence(program, monomial)
-    log(f"End get recurrence, { monomial.as_expr() }", LOG_VERBOSE)
-    return recurrence_store[monomial.as_expr()]
+    session = current_session()
+    log(f"Start get recurrence, { get_monomial_expr(program, monomial) }", LOG_VERBOSE)
+    if monomial.is_constant():
+        return {monomial: sympify(1)}
+    record_lookup("recurrence_store", monomial in session.recurrence_store)
+    if monomial not in session.recurrence_store:
+        recurrence = None
+        if session.cache is not None:
+            recurrence = session.cache.get(session.fingerprint, KIND_RECURRENCE, get_monomial_expr(program, monomial))
+        if recurrence is None:
+            with phase("compute_recurrence"):
+                session.recurrence_store[monomial] = compute_recurrence(program, monomial)
+                record_size(session.recurrence_store[monomial])
+            if session.cache is not None:
+                recurrence = terms_to_expr(session.recurrence_store[monomial], program.variables)
+                session.cache.put(
+                    session.fingerprint, KIND_RECURRENCE, get_monomial_expr(program, monomial), recurrence
+                )
+        else:
+            session.recurrence_store[monomial] = expr_to_terms(recurrence, program.variables)
+    log(f"End get recurrence, { get_monomial_expr(program, monomial) }", LOG_VERBOSE)
+    return session.recurrence_store[monomial]
+
+
+def get_resolved_recurrence(program: Program, monomial: Monomial) -> Dict[Monomial, Expr]:
+    """
+    For a given monomial returns its recurrence with all placeholders replaced by the solutions of their monomials
+    """
+    return resolve_placeholders(program, get_recurrence(program, monomial))
 
 
-def compute_recurrence(program: Program, monomial: Poly):
+def compute_recurrence(program: Program, monomial: Monomial) -> Dict[Monomial, Expr]:
     """
-    Iteratively splits a monomial on variables which are dependent with respect to the given monomial
+    Iteratively splits a monomial on variables which are dependent with respect to the given monomial.
+    The intermediate result is kept as sparse polynomial, such that every split only rewrites the terms containing
+    the split variable.
     """
-    log(f"Start compute recurrence, { monomial.as_expr() }", LOG_VERBOSE)
-    result = monomial.as_expr()
+    log(f"Start compute recurrence, { get_monomial_expr(program, monomial) }", LOG_VERBOSE)
+    result = {monomial: sympify(1)}
     split_variables = set()
     for variable, update in reversed(program.updates.items()):
-        if variable not in result.free_symbols:
+        index = program.variable_indices[variable]
+        if not any(m.exponents[index] for m in result):
             continue
 
-        if update.is_random_var:
-            result = replace_rv_in_polynomial(program, result.as_poly(program.variables), variable).as_expr()
-            continue
+        if not update.is_random_var:
+            split_variables.add(variable)
+        log(f"Start substituting {variable} in {len(result)} terms", LOG_VERBOSE)
+        result = substitute_variable(program, result, variable)
+        log(f"End substituting {variable}", LOG_VERBOSE)
+        if not update.is_random_var:
+            with phase("presolve_independent_occurences"):
+                result = presolve_independent_occurences(program, split_variables, result)
+                record_size(result)
+
+    log(f"End compute recurrence, { get_monomial_expr(program, monomial) }", LOG_VERBOSE)
+    return result
 
-        split_variables.add(variable)
-        branches = split_expression_on_variable(program, result, variable)
-        log(f"Start combining {len(branches)} branches", LOG_VERBOSE)
-        result = sum([prob * branch for branch, prob in branches])
-        log(f"Mid combining branches", LOG_VERBOSE)
-        result = expand(result)
-        log(f"End combining branches", LOG_VERBOSE)
-        result = presolve_independent_occurences(program, split_variables, result)
 
-    log(f"End compute recurrence, { monomial.as_expr() }", LOG_VERBOSE)
-    return result.as_poly(program.variables)
+def substitute_variable(program: Program, polynomial: Dict[Monomial, Expr], variable: Symbol):
+    """
+    For a given sparse polynomial replaces every power of a given variable by the expected value of the same power of
+    its update. Terms not containing the variable are kept as they are.
+    """
+    index = program.variable_indices[variable]
+    result = {}
+    for monomial, coeff in polynomial.items():
+        power = monomial.exponents[index]
+        if power == 0:
+            add_term(result, monomial, coeff)
+            continue
+        rest = monomial.without(index)
+        for m, c in get_update_power(program, variable, power).items():
+            add_term(result, rest * m, coeff * c)
+    return without_zero_terms(result)
 
 
-def split_expression_on_variable(program: Program, expression, variable):
+def get_update_power(program: Program, variable: Symbol, power: int) -> Dict[Monomial, Expr]:
     """
-    For a given expression, splits it with the updates of a given variable.
+    Returns the expected value of the update of a given variable raised to a given power as sparse polynomial in
+    the program variables. For random variables this is the corresponding moment.
     """
-    log(f"Start split expression on variable, { variable }", LOG_VERBOSE)
-    if variable not in expression.free_symbols:
-        return [(expression, sympify(1))]
+    session = current_session()
+    key = (variable, power)
+    if key not in session.update_power_store:
+        update = program.updates[variable]
+        if update.is_random_var:
+            expected_value = sympify(update.random_var.compute_moment(power))
+        else:
+            expected_value = update.power(power)
+        session.update_power_store[key] = expr_to_terms(expected_value, program.variables)
+    return session.update_power_store[key]
+
 
-    branches = []
-    for b, p in program.updates[variable].branches:
-        branches.append((expression.xreplace({variable: b}), p))
-    log(f"End split expression on variable, { variable }", LOG_VERBOSE)
-    return branches
+def without_zero_terms(polynomial: Dict[Monomial, Expr]) -> Dict[Monomial, Expr]:
+    """
+    Expands the coefficients of a sparse polynomial and removes the terms whose coefficients vanish
+    """
+    result = {}
+    for monomial, coeff in polynomial.items():
+        coeff = expand(coeff)
+        if not coeff.is_zero:
+            result[monomial] = coeff
+    return result
 
 
-def presolve_independent_occurences(program, split_variables, result):
+def presolve_independent_occurences(program, split_variables, polynomial):
     """
-    result is a polynomial in the program variables. All variables with the exception of split_variables are sub (n+1).
-    The variables in split-variables are sub n.
+    polynomial is a sparse polynomial in the program variables. All variables with the exception of split_variables
+    are sub (n+1). The variables in split-variables are sub n.
     The function goes through every monomial M = A_n*B_{n+1} where A is a product of vars in split_variables and B
     a product of vars not in split_variables. The function checks if B_{n+1} is statistically independent from A_n
-    and substitutes the solution for B_{n+1} if so.
+    and substitutes a placeholder for the solution of B_{n+1} if so. Placeholders get resolved when the recurrence
+    is solved, such that computing recurrences never requires solving other monomials.
     """
     log(f"Start presolve independent occurrences", LOG_VERBOSE)
-    n = symbols('n', integer=True, positive=True)
-    result = result.as_poly(program.variables)
-    new_result = result.coeff_monomial(1)
-    monoms = get_monoms(result)
-    for monom in monoms:
-        powers = monom.monoms()[0]
-        a = {var: power for var, power in zip(monom.gens, powers) if power > 0 and var in split_variables}
-        b = {var: power for var, power in zip(monom.gens, powers) if power > 0 and var not in split_variables}
-        if len(b.keys()) > 0 and all_are_independent_from_all(program, b, a):
-            b_monom = prod(v ** p for v, p in b.items()).as_poly(program.variables)
-            rec_solution = get_solution(program, b_monom).xreplace({n: n+1})
-            a_monom = prod(v ** p for v, p in a.items())
-            new_result += result.coeff_monomial(monom.as_expr()) * a_monom * rec_solution
+    is_split = [v in split_variables for v in program.variables]
+    result = {}
+    for monomial, coeff in polynomial.items():
+        a = tuple(p if split else 0 for p, split in zip(monomial.exponents, is_split))
+        b = tuple(0 if split else p for p, split in zip(monomial.exponents, is_split))
+        b_variables = {v: p for v, p in zip(program.variables, b) if p > 0}
+        a_variables = {v: p for v, p in zip(program.variables, a) if p > 0}
+        if b_variables and all_are_independent_from_all(program, b_variables, a_variables):
+            add_term(result, Monomial(a), coeff * get_placeholder(program, Monomial(b)))
         else:
-            new_result += result.coeff_monomial(monom.as_expr()) * monom.as_expr()
-    return simplify(new_result)
-
-
-def replace_rv_in_polynomial(program: Program, polynomial: Poly, rv: Symbol):
-    """
-    For a given polynomial return a polynomial such that all powers of a random variable are replaced with their
-    corresponding moments.
-    """
-    log(f"Start replace rv in polynomial, { rv }", LOG_VERBOSE)
-    powers = get_powers_of_variable_in_polynomial(rv, polynomial)
-    replacements = {rv ** p: program.updates[rv].random_var.compute_moment(p) for p in powers}
-    polynomial = polynomial.as_expr().xreplace(replacements).as_poly(program.variables)
-    log(f"End replace rvs in polynomial, { rv }", LOG_VERBOSE)
-    return polynomial
+            add_term(result, monomial, coeff)
+    return without_zero_terms(result)
@@ -0,0 +1,188 @@
+"""This file is part of MORA
+
+This file contains a representation of exponential polynomials, i.e. expressions of the form
+sum c * n^d * b^n where neither the coefficients c nor the bases b depend on n. Closed forms of moments of
+prob-solvable loops always have this shape, which allows to solve their recurrences without general symbolic summation.
+"""
+
+from diofant import Add, Mul, Expr, Dummy, sympify, cancel, binomial, symbols
+from functools import lru_cache
+from typing import Dict, Tuple, Optional
+
+
+n = symbols('n', integer=True, positive=True)
+
+# The ratio in the table of power sums, which gets substituted by the concrete ratio on lookup
+ratio = Dummy('r')
+
+
+class ExpPoly:
+    """
+    An exponential polynomial stored as a mapping from (base, degree) to coefficient
+    """
+    def __init__(self, terms: Dict[Tuple[Expr, int], Expr] = None):
+        self.terms: Dict[Tuple[Expr, int], Expr] = {}
+        if terms:
+            for (base, degree), coeff in terms.items():
+                self.add_term(coeff, degree, base)
+
+    def add_term(self, coeff: Expr, degree: int, base: Expr):
+        coeff = sympify(coeff)
+        if coeff.is_zero:
+            return
+        base = canonical_base(base)
+        key = (base, degree)
+        for existing_base, existing_degree in self.terms:
+            if existing_degree == degree and bases_are_equal(existing_base, base):
+                key = (existing_base, existing_degree)
+                break
+        coeff = cancel(self.terms.get(key, 0) + coeff)
+        if coeff.is_zero:
+            self.terms.pop(key, None)
+        else:
+            self.terms[key] = coeff
+
+    def bases(self):
+        bases = []
+        for base, _ in self.terms:
+            if not any(bases_are_equal(base, b) for b in bases):
+                bases.append(base)
+        return bases
+
+    def polynomial_for_base(self, base: Expr):
+        """
+        Returns the coefficients of the polynomial in n which gets multiplied by base^n
+        """
+        return {d: c for (b, d), c in self.terms.items() if bases_are_equal(b, base)}
+
+    def __add__(self, other: "ExpPoly"):
+        result = ExpPoly(self.terms)
+        for (base, degree), coeff in other.terms.items():
+            result.add_term(coeff, degree, base)
+        return result
+
+    def __mul__(self, other: "ExpPoly"):
+        result = ExpPoly()
+        for (base1, degree1), coeff1 in self.terms.items():
+            for (base2, degree2), coeff2 in other.terms.items():
+                result.add_term(coeff1 * coeff2, degree1 + degree2, base1 * base2)
+        return result
+
+    def scale(self, factor: Expr):
+        return ExpPoly({key: factor * coeff for key, coeff in self.terms.items()})
+
+    def shift(self, k: int):
+        """
+        Returns the exponential polynomial with n replaced by n+k
+        """
+        result = ExpPoly()
+        for (base, degree), coeff in self.terms.items():
+            for j in range(degree + 1):
+                result.add_term(coeff * (base ** k) * binomial(degree, j) * (k ** (degree - j)), j, base)
+        return result
+
+    def at_zero(self):
+        return sum(c for (b, d), c in self.terms.items() if d == 0)
+
+    def as_expr(self):
+        return Add(*[coeff * (n ** degree) * (base ** n) for (base, degree), coeff in self.terms.items()])
+
+
+def canonical_base(base: Expr):
+    return cancel(sympify(base))
+
+
+def bases_are_equal(base1: Expr, base2: Expr):
+    if base1.is_Number and base2.is_Number:
+        return base1 == base2
+    return base1 == base2 or cancel(base1 - base2).is_zero
+
+
+def to_exppoly(expression: Expr) -> Optional[ExpPoly]:
+    """
+    Converts a given expression into an exponential polynomial in n. Returns None if the expression does not
+    have the shape of an exponential polynomial.
+    """
+    expression = sympify(expression).expand()
+    result = ExpPoly()
+    for term in Add.make_args(expression):
+        coeff, degree, base = sympify(1), 0, sympify(1)
+        for factor in Mul.make_args(term):
+            if not factor.has(n):
+                coeff *= factor
+            elif factor == n:
+                degree += 1
+            elif factor.is_Pow and factor.base == n and factor.exp.is_Integer and factor.exp > 0:
+                degree += int(factor.exp)
+            elif factor.is_Pow and not factor.base.has(n):
+                exponent = factor.exp.as_poly(n)
+                if exponent is None or exponent.degree() != 1:
+                    return None
+                alpha, beta = exponent.coeff_monomial(n), exponent.coeff_monomial(1)
+                if alpha.has(n) or beta.has(n):
+                    return None
+                base *= factor.base ** alpha
+                coeff *= factor.base ** beta
+            else:
+                return None
+        result.add_term(coeff, degree, base)
+    return result
+
+
+def particular_solution(recurr_coeff: Expr, base: Expr, polynomial: Dict[int, Expr]) -> ExpPoly:
+    """
+    Computes a particular solution of f(n+1) = recurr_coeff * f(n) + P(n) * base^n by the method of undetermined
+    coefficients, where P is given by its coefficients. The particular solution vanishes at n = 0 in the resonant case.
+    """
+    max_degree = max(polynomial.keys())
+    if bases_are_equal(base, recurr_coeff):
+        # Ansatz: base^n * Q(n) with Q(0) = 0 and Q(n+1) - Q(n) = P(n) / base
+        q = {}
+        for j in reversed(range(max_degree + 1)):
+            rest = sum(q[m] * binomial(m, j) for m in range(j + 2, max_degree + 2))
+            q[j + 1] = cancel((polynomial.get(j, 0) / base - rest) / (j + 1))
+        return ExpPoly({(base, d): c for d, c in q.items()})
+
+    # Ansatz: base^n * Q(n) with base * Q(n+1) - recurr_coeff * Q(n) = P(n)
+    q = {}
+    for j in reversed(range(max_degree + 1)):
+        rest = base * sum(q[m] * binomial(m, j) for m in range(j + 1, max_degree + 1))
+        q[j] = cancel((polynomial.get(j, 0) - rest) / (base - recurr_coeff))
+    return ExpPoly({(base, d): c for d, c in q.items()})
+
+
+@lru_cache(maxsize=None)
+def power_sum(degree: int, resonant: bool) -> Dict[int, Expr]:
+    """
+    Returns the table entry for the sum of k^degree * r^k over k = 0, ..., n-1 as the coefficients of a polynomial
+    Q(n) in n. For r = 1 (resonant) the sum is Q(n), otherwise it is r^n * Q(n) - Q(0). The coefficients are
+    rational functions in the symbolic ratio r, which gets substituted on lookup.
+    """
+    if resonant:
+        return particular_solution(sympify(1), sympify(1), {degree: sympify(1)}).polynomial_for_base(sympify(1))
+    return particular_solution(sympify(1), ratio, {degree: sympify(1)}).polynomial_for_base(ratio)
+
+
+def sum_recurrence(recurr_coeff: Expr, inhom_part: ExpPoly, initial_value: Expr) -> ExpPoly:
+    """
+    Computes the (unique) solution to the recurrence relation f(0) = initial_value; f(n+1) = a * f(n) + g(n), where
+    a = recurr_coeff and g = inhom_part, as f(n) = a^n * f(0) + sum of a^(n-1-k) * g(k) over k = 0, ..., n-1.
+    Every term c * k^d * b^k of g contributes c/a * a^n * sum of k^d * (b/a)^k, which is looked up in the table
+    of power sums.
+    """
+    if recurr_coeff.is_zero:
+        return inhom_part.shift(-1)
+
+    solution = ExpPoly({(recurr_coeff, 0): initial_value})
+    for (base, degree), coeff in inhom_part.terms.items():
+        factor = coeff / recurr_coeff
+        if bases_are_equal(base, recurr_coeff):
+            for d, c in power_sum(degree, True).items():
+                solution.add_term(factor * c, d, recurr_coeff)
+            continue
+        r = cancel(base / recurr_coeff)
+        polynomial = {d: c.xreplace({ratio: r}) for d, c in power_sum(degree, False).items()}
+        for d, c in polynomial.items():
+            solution.add_term(factor * c, d, base)
+        solution.add_term(-factor * polynomial.get(0, 0), 0, recurr_coeff)
+    return solution
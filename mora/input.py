@@ -8,9 +8,25 @@ from diofant import symbols, Symbol
 from .utils import *
 from .core import Program
 import os
+import pkgutil
 from lark import Lark, Visitor
 
-GRAMMAR_FILE_PATH = "mora/prob_solvable.lark"
+GRAMMAR_FILE = "prob_solvable.lark"
+
+# The LALR parser for prob-solvable loops, built lazily on first use and shared by all InputParsers
+lark_parser: Lark = None
+
+
+def get_lark_parser() -> Lark:
+    """
+    Returns the parser for prob-solvable loops. The grammar is loaded from the package, such that parsing does not
+    depend on the working directory, and the compiled grammar is cached on disk by lark.
+    """
+    global lark_parser
+    if lark_parser is None:
+        grammar = pkgutil.get_data(__package__, GRAMMAR_FILE).decode()
+        lark_parser = Lark(grammar, parser="lalr", cache=True)
+    return lark_parser
 
 
 class InputParser:
@@ -29,10 +45,7 @@ class InputParser:
             #raise Exception(f"File {source} not found")
 
     def parse_source(self):
-        with open(GRAMMAR_FILE_PATH) as grammar_file:
-            lark_parser = Lark(grammar_file)
-
-        tree = lark_parser.parse(self.__program.source)
+        tree = get_lark_parser().parse(self.__program.source)
         visitor = UpdateProgramVisitor(self.__program)
         visitor.visit(tree)
         self.__set_unknown_initializations()
@@ -54,10 +67,17 @@ class InputParser:
                     update.random_var = RandomVar("finite", update.branches)
 
     def __set_dependencies(self):
+        # Two variables are dependent iff they share an ancestor
         ancestors = self.__program.ancestors
         variables = self.__program.variables
+        descendants = [0] * len(variables)
+        for variable in variables:
+            for index in mask_to_indices(ancestors[variable]):
+                descendants[index] |= variable_mask(self.__program, [variable])
         for variable in variables:
-            dependencies = {v for v in variables if ancestors[variable] & ancestors[v]}
+            dependencies = 0
+            for index in mask_to_indices(ancestors[variable]):
+                dependencies |= descendants[index]
             self.__program.dependencies[variable] = dependencies
 
     def __set_unknown_initializations(self):
@@ -81,6 +101,7 @@ class UpdateProgramVisitor(Visitor):
         if variable in self.forbidden_variables:
             raise Exception("Program is not prob-solvable. Circular variable dependencies.")
         expression = str(tree.children[1])
+        self.program.variable_indices[variable] = len(self.program.variables)
         self.program.variables.append(variable)
         self.program.updates[variable] = Update(variable, expression, program_variables=self.program.variables)
         self.forbidden_variables.union(
@@ -90,17 +111,16 @@ class UpdateProgramVisitor(Visitor):
 
     def __set_ancestors_for_variable(self, variable: Symbol):
         if self.program.updates[variable].is_random_var:
-            self.program.ancestors[variable] = set()
+            self.program.ancestors[variable] = 0
             return
 
         parents = set()
         for branch in self.program.updates[variable].branches:
-            parents = parents.union(branch[0].free_symbols)
-        parents = parents.intersection(self.program.variables)
+            parents.update(s for s in branch[0].free_symbols if s in self.program.variable_indices)
 
-        ancestors = parents.copy()
+        ancestors = variable_mask(self.program, parents)
         for parent in parents:
             if parent != variable:
-                ancestors = ancestors.union(self.program.ancestors[parent])
+                ancestors |= self.program.ancestors[parent]
 
         self.program.ancestors[variable] = ancestors
@@ -4,25 +4,157 @@ This is the main function calling the parser, the solver and then output the res
 """
 
 from .input import InputParser
-from .output import output_results
+from .output import output_results, ResultStream, MoraResult
+from .profiler import phase
 from .core import *
 from timeit import default_timer as timer
+from typing import Iterable
 
 
-def mora(source: str, goal: int = 1, output_format: str = ""):
+def mora(source: str, goal: int = 1, output_format: str = "", solver: str = SOLVER_SUMMATION,
+         cache: SolutionCache = None, jobs: int = 1, stream: ResultStream = None, structured: bool = False,
+         incremental: bool = False, max_monomials: int = None):
+    """
+    Runs MORA on the given source for the given goal and returns the formatted moments. If structured is true a
+    MoraResult with the raw expressions, timings and errors gets returned instead and the moments are only printed
+    if an output format is given. If incremental is true all results of the previous run which are not affected by
+    the changes to the program get reused. If max_monomials is given the goal gets planned first and fails without
+    solving anything if it needs more monomials.
+    """
+    result = MoraResult(source.split("/")[-1], goal)
     try:
         log("Parsing Input", LOG_ESSENTIAL)
+        start = timer()
         parser = InputParser()
         parser.set_source(source)
         program = parser.parse_source()
+        result.benchmark = program.name
+        result.parse_time = timer() - start
         log("Finished parsing", LOG_ESSENTIAL)
 
         start = timer()
-        moments = core(program, None, goal)
+        with phase(program.name), phase(f"goal_{goal}"):
+            start_session(program, solver, cache, jobs, stream, incremental)
+            if max_monomials is not None:
+                plan_goals(program, None, goal, max_monomials)
+            moments = solve_goals(program, None, goal)
         time = timer() - start
 
+        if structured:
+            result.moments = moments
+            result.monomial_stats = get_monomial_stats(program, moments)
+            result.time = time
+            if output_format:
+                output_results(program, moments, time, output_format)
+            return result
         out = output_results(program, moments, time, output_format)
         return out
+    except Exception as exception:
+        if structured:
+            result.error = str(exception) or type(exception).__name__
+            return result
+        print("Execution failed!")
+        print(exception)
+
+
+def mora_goals(source: str, goals: Iterable[int] = (1,), output_format: str = "", solver: str = SOLVER_SUMMATION,
+               cache: SolutionCache = None, jobs: int = 1, stream: ResultStream = None, structured: bool = False,
+               incremental: bool = False, max_monomials: int = None):
+    """
+    Like mora but parses the source only once and solves all goals in one session, such that moments which are
+    needed by multiple goals only get computed once. Returns the output (or MoraResult if structured) for every goal.
+    """
+    outs = {}
+    name = source.split("/")[-1]
+    try:
+        log("Parsing Input", LOG_ESSENTIAL)
+        start = timer()
+        parser = InputParser()
+        parser.set_source(source)
+        program = parser.parse_source()
+        name = program.name
+        parse_time = timer() - start
+        log("Finished parsing", LOG_ESSENTIAL)
+
+        start_session(program, solver, cache, jobs, stream, incremental)
+        for goal in goals:
+            start = timer()
+            with phase(program.name), phase(f"goal_{goal}"):
+                if max_monomials is not None:
+                    plan_goals(program, None, goal, max_monomials)
+                moments = dict(solve_goals(program, None, goal))
+            time = timer() - start
+            if structured:
+                result = MoraResult(name, goal)
+                result.moments = moments
+                result.monomial_stats = get_monomial_stats(program, moments)
+                result.parse_time = parse_time
+                result.time = time
+                outs[goal] = result
+                if output_format:
+                    output_results(program, moments, time, output_format)
+            else:
+                outs[goal] = output_results(program, moments, time, output_format)
+        return outs
+    except Exception as exception:
+        if structured:
+            for goal in goals:
+                if goal not in outs:
+                    outs[goal] = MoraResult(name, goal)
+                    outs[goal].error = str(exception) or type(exception).__name__
+            return outs
+        print("Execution failed!")
+        print(exception)
+
+
+def mora_plan(source: str, goals: Iterable[int] = (1,), cache: SolutionCache = None,
+              max_monomials: int = None) -> Dict[int, MonomialPlan]:
+    """
+    Plans the given goals without solving anything and prints the number of needed monomials and the estimated cost
+    of every goal. Monomials found in the cache are not planned. Returns the plan of every goal.
+    """
+    plans = {}
+    try:
+        parser = InputParser()
+        parser.set_source(source)
+        program = parser.parse_source()
+        start_session(program, cache=cache)
+        for goal in goals:
+            start = timer()
+            try:
+                plans[goal] = plan_goals(program, None, goal, max_monomials)
+            except PlanLimitExceeded as exception:
+                print(f"{program.name} (goal {goal}): {exception}")
+                continue
+            print(f"{program.name} (goal {goal}): {plans[goal]}, planned in {timer() - start:.2f}s")
+        return plans
+    except Exception as exception:
+        print("Execution failed!")
+        print(exception)
+
+
+def mora_numeric(source: str, goal: int = 1, iterations: int = 100, parameters: dict = None, exact: bool = False):
+    """
+    Evaluates the moments of the given goal for n = 0, ..., iterations numerically without computing closed forms.
+    Prints the moments after the last iteration and returns the moments for all iterations.
+    """
+    # NumPy is only needed for numeric evaluation, hence it is imported lazily
+    from .numeric import numeric_moments
+    try:
+        log("Parsing Input", LOG_ESSENTIAL)
+        parser = InputParser()
+        parser.set_source(source)
+        program = parser.parse_source()
+        log("Finished parsing", LOG_ESSENTIAL)
+
+        start = timer()
+        moments = numeric_moments(program, None, goal, iterations, parameters, exact)
+        time = timer() - start
+
+        for monomial, values in moments.items():
+            print(f" E[{monomial}]({iterations}) = {values[-1]}")
+        print("Computation time {}s.".format(time))
+        return moments
     except Exception as exception:
         print("Execution failed!")
         print(exception)
@@ -0,0 +1,180 @@
+"""This file is part of MORA
+
+This file contains a numeric mode which evaluates moments at concrete iterations n = 0, ..., N without computing
+closed forms. The recurrences of all needed monomials are instantiated with concrete parameter values and iterated,
+either in float64 arithmetic with NumPy or exactly with fractions. Parameters may be given as NumPy arrays, in which
+case all moments get computed for the whole parameter sweep at once.
+It also contains an evaluator compiling closed forms into NumPy functions, which evaluate all moments over arrays of
+n and parameter values in one batched call.
+"""
+
+from fractions import Fraction
+from typing import Dict, List, Tuple
+
+import numpy
+from diofant import Expr, Symbol, Dummy, Rational, lambdify, sympify, cse, numbered_symbols
+from diofant.core.function import AppliedUndef
+
+from .core import Program, start_session, get_recurrence, get_dependency_order, get_expected_initial_value, \
+    get_placeholder_monomials
+from .utils import Monomial
+
+
+class MissingParameters(Exception):
+    pass
+
+
+def numeric_moments(program: Program, goal_monomials: List[Expr] = None, goal_power: int = 1,
+                    iterations: int = 100, parameters: Dict[str, object] = None, exact: bool = False):
+    """
+    Returns the expected values of given monomials raised to a given power for n = 0, ..., iterations together
+    with the values of all monomials they depend on. If no monomials are given the moments of all program variables
+    get computed. Parameters are given by name, their values can be numbers or NumPy arrays. With exact arithmetic
+    every moment is a list of fractions, otherwise a NumPy array with the iterations as first axis.
+    """
+    parameters = {str(k): v for k, v in (parameters or {}).items()}
+    if goal_monomials is None:
+        goal_monomials = [v**goal_power for v in program.variables]
+    goals = [Monomial(sympify(m).as_poly(program.variables).monoms()[0]) for m in goal_monomials]
+
+    start_session(program)
+    order = get_numeric_order(program, goals)
+    compiled = [(m, compile_recurrence(program, m, parameters, exact)) for m in order]
+    # Monomials which do not occur at n in any recurrence are never needed at n = 0, their initial values may be unknown
+    needed = {current for _, terms in compiled for _, current, _ in terms}
+    values = {}
+    for m in order:
+        initial_value = None if exact else numpy.nan
+        try:
+            initial_value = to_number(get_expected_initial_value(program, m), parameters, exact)
+        except MissingParameters:
+            if m in needed:
+                raise
+        values[m] = [initial_value]
+
+    for t in range(iterations):
+        for m, terms in compiled:
+            total = 0
+            for coeff, current, nexts in terms:
+                value = coeff
+                if current is not None:
+                    value = value * values[current][t]
+                for placeholder in nexts:
+                    value = value * values[placeholder][t + 1]
+                total = total + value
+            values[m].append(total)
+
+    results = {}
+    for m in order:
+        key = m.as_expr(program.variables)
+        results[key] = values[m] if exact else numpy.array(numpy.broadcast_arrays(*values[m]), dtype=numpy.float64)
+    return results
+
+
+def get_numeric_order(program: Program, goals: List[Monomial]) -> List[Monomial]:
+    """
+    Returns all monomials needed for the goals in an order such that every monomial comes after all monomials
+    it depends on
+    """
+    return get_dependency_order(program, goals)
+
+
+def compile_recurrence(program: Program, monomial: Monomial, parameters: Dict[str, object], exact: bool) \
+        -> List[Tuple[object, Monomial, List[Monomial]]]:
+    """
+    Instantiates the recurrence of a monomial with the given parameters. Every term of the recurrence is returned as
+    triple of its numeric coefficient, the monomial whose value at n it gets multiplied with (None for constants)
+    and the monomials whose values at n+1 it gets multiplied with (from placeholders).
+    """
+    recurrence = get_recurrence(program, monomial)
+    terms = []
+    for m, coeff in recurrence.items():
+        current = None if m.is_constant() else m
+        placeholders = get_placeholder_monomials(program, {m: coeff})
+        if not placeholders:
+            terms.append((to_number(coeff, parameters, exact), current, []))
+            continue
+        # Placeholder coefficients are polynomials in the placeholders, which stand for values at n+1
+        symbols = [s for s in sorted(coeff.free_symbols, key=str) if s.name.startswith("E[")]
+        for powers, c in coeff.as_poly(symbols).terms():
+            nexts = [p for p, power in zip(placeholders, powers) for _ in range(power)]
+            if monomial in nexts:
+                raise Exception("Program is not prob-solvable. Circular monomial dependencies.")
+            terms.append((to_number(c, parameters, exact), current, nexts))
+    return terms
+
+
+def to_number(expression: Expr, parameters: Dict[str, object], exact: bool):
+    """
+    Evaluates an expression for the given parameters either as fraction or in float64 arithmetic.
+    Unknown initial values like x(0) are parameters as well.
+    """
+    expression = unknowns_as_symbols(expression)
+    symbols: List[Symbol] = sorted(expression.free_symbols, key=str)
+    missing = [s.name for s in symbols if s.name not in parameters]
+    if missing:
+        raise MissingParameters(f"Numeric evaluation needs values for the parameters {', '.join(missing)}")
+
+    if exact:
+        value = expression.xreplace({s: Rational(str(parameters[s.name])) for s in symbols})
+        if not value.is_Rational:
+            raise Exception(f"The value {value} cannot be represented exactly as fraction")
+        return Fraction(int(value.numerator), int(value.denominator))
+
+    value = lambdify(symbols, expression, "numpy")(*[parameters[s.name] for s in symbols])
+    return value if isinstance(value, numpy.ndarray) else float(value)
+
+
+def unknowns_as_symbols(expression: Expr) -> Expr:
+    """
+    Replaces unknown initial values like x(0) by symbols of the same name, such that they can be used as parameters
+    """
+    expression = sympify(expression)
+    return expression.xreplace({f: Dummy(str(f)) for f in expression.atoms(AppliedUndef)})
+
+
+class MomentEvaluator:
+    """
+    Compiles closed forms of moments into NumPy functions. Common subexpressions of all moments get compiled and
+    evaluated only once per call. The moments get evaluated for arrays of n and parameter values, which are
+    broadcast against each other.
+    """
+
+    def __init__(self, moments: Dict[Expr, Expr]):
+        self.monomials: List[Expr] = list(moments.keys())
+        expressions = [unknowns_as_symbols(e) for e in moments.values()]
+        replacements, reduced = cse(expressions, symbols=numbered_symbols("_cse", cls=Dummy))
+        intermediates = {symbol for symbol, _ in replacements}
+        self.parameters: List[str] = sorted({
+            s.name for e in expressions for s in e.free_symbols if s not in intermediates
+        })
+        self.steps = [(symbol,) + self.compile(e) for symbol, e in replacements]
+        self.outputs = [self.compile(e) for e in reduced]
+
+    @staticmethod
+    def compile(expression: Expr):
+        arguments = sorted(expression.free_symbols, key=str)
+        return arguments, lambdify(arguments, expression, "numpy")
+
+    def evaluate(self, values: Dict[str, object]) -> Dict[Expr, numpy.ndarray]:
+        """
+        Evaluates all moments for the given values of n and the parameters, given by name
+        """
+        missing = [name for name in self.parameters if name not in values]
+        if missing:
+            raise MissingParameters(f"Evaluation needs values for {', '.join(missing)}")
+        values = {name: numpy.asarray(value, dtype=numpy.float64) for name, value in values.items()}
+        shape = numpy.broadcast_shapes(*[value.shape for value in values.values()])
+
+        environment = {}
+
+        def get_value(symbol):
+            return environment[symbol] if symbol in environment else values[symbol.name]
+
+        for symbol, arguments, function in self.steps:
+            environment[symbol] = function(*[get_value(a) for a in arguments])
+        results = {}
+        for monomial, (arguments, function) in zip(self.monomials, self.outputs):
+            result = function(*[get_value(a) for a in arguments])
+            results[monomial] = numpy.broadcast_to(numpy.asarray(result, dtype=numpy.float64), shape)
+        return results
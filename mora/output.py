@@ -1,6 +1,12 @@
 
+import json
+import os
+import pickle
 from datetime import datetime
-from diofant import latex
+from diofant import latex, srepr, sympify, Expr
+from typing import Dict, Tuple, Optional, List
+from .constants import DEFAULT_STREAM_PATH
+
 
 
 def output_results(prog, invariants, computation_time, output_format=" "):
@@ -25,3 +31,165 @@ def output_results(prog, invariants, computation_time, output_format=" "):
             print(" E[{}] = {}".format(k.as_expr(), invariants[k]))
     print("Computation time {}s.".format(computation_time))
     return [" E[{}] = {}".format(k.as_expr(), invariants[k]) for k in invariants if k]
+
+
+class ResultStream:
+    """
+    Writes one JSON line per solved monomial as soon as it is solved, appending to a single file per run.
+    Every line is written as soon as its monomial is solved, such that a killed run loses nothing but the monomial
+    it was solving. When resuming, the records already in the file are loaded and monomials recorded for the same program
+    do not get solved again.
+    """
+    def __init__(self, path: str = DEFAULT_STREAM_PATH, resume: bool = False):
+        self.path = path
+        self.records: Dict[Tuple[str, str], str] = {}
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        complete = True
+        if resume and os.path.exists(path):
+            complete = self.__load()
+        # Writes are unbuffered and whole lines only, such that multiple processes can append to the same file
+        self.__file = open(path, "ab" if resume else "wb", buffering=0)
+        # Terminates the incomplete last line of a killed run before the first new line
+        self.__prefix = "" if complete else "\n"
+
+    def __load(self) -> bool:
+        with open(self.path) as file:
+            content = file.read()
+        for line in content.splitlines():
+            try:
+                record = json.loads(line)
+                self.records[(record["program"], record["monomial"])] = record["srepr"]
+            except (ValueError, KeyError):
+                # The last line of a killed run may be incomplete
+                continue
+        return not content or content.endswith("\n")
+
+    def get(self, fingerprint: str, monomial: Expr) -> Optional[Expr]:
+        value = self.records.get((fingerprint, str(monomial)))
+        return None if value is None else sympify(value)
+
+    def write(self, benchmark: str, fingerprint: str, monomial: Expr, solution: Expr, seconds: float):
+        record = {
+            "benchmark": benchmark,
+            "program": fingerprint,
+            "monomial": str(monomial),
+            "expression": str(solution),
+            "srepr": srepr(solution),
+            "time": seconds,
+        }
+        self.records[(fingerprint, str(monomial))] = record["srepr"]
+        # A single line is cheap compared to solving a monomial, so it gets written right away
+        self.__file.write((self.__prefix + json.dumps(record) + "\n").encode())
+        self.__prefix = ""
+
+    def close(self):
+        self.__file.close()
+
+
+class MoraResult:
+    """
+    The structured result of running MORA on a benchmark for one goal. The moments are the raw expressions keyed by
+    their monomials, the stats contain the solving time and recurrence size per monomial. If the run failed, error
+    contains the reason and the moments are empty. Results of the parallel runner additionally carry the status
+    and the peak memory in MB of their worker process, which are None otherwise.
+    """
+    def __init__(self, benchmark: str, goal: int):
+        self.benchmark: str = benchmark
+        self.goal: int = goal
+        self.moments: Dict[Expr, Expr] = {}
+        self.monomial_stats: Dict[Expr, dict] = {}
+        self.parse_time: float = 0.0
+        self.time: float = 0.0
+        self.error: Optional[str] = None
+        self.status: Optional[str] = None
+        self.peak_memory: Optional[float] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def as_dict(self):
+        return {
+            "benchmark": self.benchmark,
+            "goal": self.goal,
+            "moments": [
+                {
+                    "monomial": str(m),
+                    "expression": str(e),
+                    "srepr": [srepr(m), srepr(e)],
+                    **self.monomial_stats.get(m, {}),
+                }
+                for m, e in self.moments.items()
+            ],
+            "parse_time": self.parse_time,
+            "time": self.time,
+            "error": self.error,
+            "status": self.status,
+            "peak_memory": self.peak_memory,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "MoraResult":
+        result = cls(data["benchmark"], data["goal"])
+        for moment in data["moments"]:
+            monomial, expression = map(sympify, moment["srepr"])
+            result.moments[monomial] = expression
+            result.monomial_stats[monomial] = {
+                k: v for k, v in moment.items() if k not in ("monomial", "expression", "srepr")
+            }
+        result.parse_time = data["parse_time"]
+        result.time = data["time"]
+        result.error = data["error"]
+        result.status = data.get("status")
+        result.peak_memory = data.get("peak_memory")
+        return result
+
+    def __getstate__(self):
+        # Undefined functions like x(0) cannot be pickled and singletons like 1/2 cannot be unpickled in another
+        # process, so all expressions are stored in srepr form
+        state = self.__dict__.copy()
+        state["moments"] = [(srepr(m), srepr(e)) for m, e in self.moments.items()]
+        state["monomial_stats"] = [(srepr(m), stats) for m, stats in self.monomial_stats.items()]
+        return state
+
+    def __setstate__(self, state):
+        state["moments"] = {sympify(m): sympify(e) for m, e in state["moments"]}
+        state["monomial_stats"] = {sympify(m): stats for m, stats in state["monomial_stats"]}
+        # Results pickled before the runner fields existed
+        state.setdefault("status", None)
+        state.setdefault("peak_memory", None)
+        self.__dict__.update(state)
+
+
+def results_to_json(results: List[MoraResult]) -> str:
+    return json.dumps([result.as_dict() for result in results], indent=2)
+
+
+def results_from_json(text: str) -> List[MoraResult]:
+    return [MoraResult.from_dict(data) for data in json.loads(text)]
+
+
+def write_results(results: List[MoraResult], path: str):
+    """
+    Writes the given results to a file, as JSON if the path ends with .json and pickled otherwise
+    """
+    if path.endswith(".json"):
+        with open(path, "w") as file:
+            file.write(results_to_json(results))
+    else:
+        with open(path, "wb") as file:
+            pickle.dump(results, file)
+
+
+def read_results(path: str) -> List[MoraResult]:
+    """
+    Reads results written by write_results
+    """
+    if path.endswith(".json"):
+        with open(path) as file:
+            return results_from_json(file.read())
+    with open(path, "rb") as file:
+        return pickle.load(file)
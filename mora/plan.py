@@ -0,0 +1,89 @@
+"""This file is part of MORA
+
+This file contains the plan of all monomials needed for a set of goals, which gets computed before anything is
+solved. The plan only needs the recurrences of the monomials, not their solutions, and estimates the cost of solving
+each monomial by the number of terms of its recurrence. It is used to report the size of a goal in advance and to
+order the solving of the monomials.
+"""
+
+import heapq
+from typing import Dict, List, Set
+
+from .utils import Monomial
+
+
+class PlanLimitExceeded(Exception):
+    pass
+
+
+class MonomialPlan:
+    """
+    The closure of the unsolved monomials needed for some goals. For every monomial it holds the monomials its
+    recurrence depends on and the number of terms of its recurrence. The order contains all monomials such that
+    each comes after its dependencies, preferring the cheapest monomial whenever there is a choice, which keeps the
+    number and size of expressions waiting for their dependents small.
+    """
+
+    def __init__(self, variables, goals: List[Monomial], dependencies: Dict[Monomial, Set[Monomial]],
+                 terms: Dict[Monomial, int]):
+        self.variables = variables
+        self.goals: List[Monomial] = goals
+        self.dependencies: Dict[Monomial, Set[Monomial]] = dependencies
+        self.terms: Dict[Monomial, int] = terms
+        self.order: List[Monomial] = get_plan_order(dependencies, terms)
+
+    @property
+    def size(self) -> int:
+        return len(self.dependencies)
+
+    @property
+    def cost(self) -> int:
+        """
+        The estimated cost of solving all planned monomials, i.e. the total number of their recurrence terms
+        """
+        return sum(self.terms.values())
+
+    def max_degree(self) -> int:
+        return max((sum(m.exponents) for m in self.dependencies), default=0)
+
+    def max_terms(self) -> int:
+        return max(self.terms.values(), default=0)
+
+    def as_dict(self) -> dict:
+        return {
+            "monomials": self.size,
+            "cost": self.cost,
+            "max_degree": self.max_degree(),
+            "max_terms": self.max_terms(),
+            "order": [str(m.as_expr(self.variables)) for m in self.order],
+        }
+
+    def __str__(self):
+        return f"{self.size} monomials, estimated cost {self.cost} recurrence terms, " \
+               f"max degree {self.max_degree()}, largest recurrence {self.max_terms()} terms"
+
+
+def get_plan_order(dependencies: Dict[Monomial, Set[Monomial]], terms: Dict[Monomial, int]) -> List[Monomial]:
+    """
+    Returns the monomials in topological order, picking the monomial with the fewest recurrence terms among all
+    monomials whose dependencies come before
+    """
+    dependents = {m: [] for m in dependencies}
+    missing = {}
+    for m, ds in dependencies.items():
+        missing[m] = len(ds)
+        for d in ds:
+            dependents[d].append(m)
+    ready = [(terms[m], m.exponents, m) for m, count in missing.items() if count == 0]
+    heapq.heapify(ready)
+    order = []
+    while ready:
+        _, _, m = heapq.heappop(ready)
+        order.append(m)
+        for dependent in dependents[m]:
+            missing[dependent] -= 1
+            if missing[dependent] == 0:
+                heapq.heappush(ready, (terms[dependent], dependent.exponents, dependent))
+    if len(order) < len(dependencies):
+        raise Exception("Program is not prob-solvable. Circular monomial dependencies.")
+    return order
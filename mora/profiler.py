@@ -0,0 +1,186 @@
+"""This file is part of MORA
+
+This file contains a profiler recording the wall time, call counts and expression sizes of the phases MORA goes
+through for every monomial, together with hit and miss counts of the stores. Phases nest, such that the data can be
+exported as JSON as well as in the folded stack format read by flame graph tools (one "frame;frame;frame count" line
+per stack). If profiling is not active, all functions of this module do nothing.
+"""
+
+import json
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Tuple
+
+from diofant import Expr, count_ops
+
+from .constants import DEFAULT_PROFILE_PATH
+
+
+class PhaseStats:
+    def __init__(self):
+        self.calls: int = 0
+        self.time: float = 0.0
+        self.self_time: float = 0.0
+        self.size_total: int = 0
+        self.size_max: int = 0
+
+    def add_size(self, size: int):
+        self.size_total += size
+        self.size_max = max(self.size_max, size)
+
+    def as_dict(self):
+        return {
+            "calls": self.calls,
+            "time": self.time,
+            "self_time": self.self_time,
+            "size_total": self.size_total,
+            "size_max": self.size_max,
+        }
+
+
+class Profiler:
+    def __init__(self):
+        # Every open frame is a list [label, name, monomial, start time, time spent in child frames]
+        self.frames: List[list] = []
+        self.stacks: Dict[Tuple[str, ...], PhaseStats] = {}
+        self.monomial_phases: Dict[Tuple[str, str], PhaseStats] = {}
+        self.lookups: Dict[str, List[int]] = {}
+
+    def enter(self, name: str, monomial: str = None):
+        label = name
+        if monomial is None:
+            monomial = self.frames[-1][2] if self.frames else ""
+        else:
+            label = f"{name}:E[{monomial}]"
+        self.frames.append([label, name, monomial, time.perf_counter(), 0.0])
+
+    def exit(self):
+        _, name, monomial, start, child_time = self.frames[-1]
+        elapsed = time.perf_counter() - start
+        path = tuple(frame[0] for frame in self.frames)
+        self.frames.pop()
+        if self.frames:
+            self.frames[-1][4] += elapsed
+
+        for stats in self.get_stats(path, name, monomial):
+            stats.calls += 1
+            stats.time += elapsed
+            stats.self_time += elapsed - child_time
+
+    def get_stats(self, path: Tuple[str, ...], name: str, monomial: str) -> List[PhaseStats]:
+        if path not in self.stacks:
+            self.stacks[path] = PhaseStats()
+        if (monomial, name) not in self.monomial_phases:
+            self.monomial_phases[(monomial, name)] = PhaseStats()
+        return [self.stacks[path], self.monomial_phases[(monomial, name)]]
+
+    def add_size(self, size: int):
+        _, name, monomial, _, _ = self.frames[-1]
+        path = tuple(frame[0] for frame in self.frames)
+        for stats in self.get_stats(path, name, monomial):
+            stats.add_size(size)
+
+    def record_lookup(self, store: str, hit: bool):
+        if store not in self.lookups:
+            self.lookups[store] = [0, 0]
+        self.lookups[store][0 if hit else 1] += 1
+
+    def as_dict(self):
+        monomials = {}
+        for (monomial, name), stats in self.monomial_phases.items():
+            # Phases outside of any monomial (like the program and goal frames) are only part of the stacks
+            if monomial:
+                monomials.setdefault(monomial, {})[name] = stats.as_dict()
+        stores = {}
+        for store, (hits, misses) in self.lookups.items():
+            stores[store] = {"hits": hits, "misses": misses, "hit_rate": hits / (hits + misses)}
+        return {
+            "monomials": monomials,
+            "stores": stores,
+            "stacks": [{"stack": list(path), **stats.as_dict()} for path, stats in self.stacks.items()],
+        }
+
+    def folded_stacks(self) -> List[str]:
+        """
+        Returns the self time of every stack in microseconds in the folded stack format
+        """
+        lines = []
+        for path, stats in self.stacks.items():
+            frames = [frame.replace(";", ",").replace(" ", "") for frame in path]
+            lines.append(f"{';'.join(frames)} {max(int(stats.self_time * 1e6), 0)}")
+        return lines
+
+    def write(self, path: str = DEFAULT_PROFILE_PATH):
+        """
+        Writes the profile to path.json and the stacks for flame graphs to path.folded
+        """
+        with open(f"{path}.json", "w") as file:
+            json.dump(self.as_dict(), file, indent=2)
+        with open(f"{path}.folded", "w") as file:
+            file.write("\n".join(self.folded_stacks()) + "\n")
+
+
+# The profiler recording the current run, None if profiling is not active
+active_profiler: Profiler = None
+
+
+def start_profiling() -> Profiler:
+    global active_profiler
+    active_profiler = Profiler()
+    return active_profiler
+
+
+def stop_profiling() -> Profiler:
+    global active_profiler
+    profiler = active_profiler
+    active_profiler = None
+    return profiler
+
+
+def is_profiling() -> bool:
+    return active_profiler is not None
+
+
+@contextmanager
+def profiled_phase(name: str, monomial: str):
+    active_profiler.enter(name, monomial)
+    try:
+        yield
+    finally:
+        active_profiler.exit()
+
+
+@contextmanager
+def no_phase():
+    yield
+
+
+def phase(name: str, monomial=None):
+    """
+    Returns a context manager recording the time spent in the given phase. If a monomial is given the phase and all
+    phases nested in it get attributed to that monomial, otherwise to the monomial of the enclosing phase.
+    """
+    if active_profiler is None:
+        return no_phase()
+    return profiled_phase(name, None if monomial is None else str(monomial))
+
+
+def record_size(expression):
+    """
+    Records the size of an expression (its number of operations) or sparse polynomial (its number of terms) produced
+    in the current phase
+    """
+    if active_profiler is None or not active_profiler.frames:
+        return
+    if isinstance(expression, dict):
+        active_profiler.add_size(len(expression))
+    elif isinstance(expression, Expr):
+        active_profiler.add_size(count_ops(expression))
+
+
+def record_lookup(store: str, hit: bool):
+    """
+    Records whether a lookup in the given store was a hit or a miss
+    """
+    if active_profiler is not None:
+        active_profiler.record_lookup(store, hit)
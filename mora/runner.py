@@ -0,0 +1,177 @@
+"""This file is part of MORA
+
+This file contains a runner which executes MORA on many (benchmark, goal) pairs in parallel worker processes.
+Every task runs in its own process with a timeout and a memory limit, such that a crash or hang of a single program
+does not stall the whole sweep. Results are collected in submission order to keep the output deterministic.
+"""
+
+import io
+import resource
+import time
+from contextlib import redirect_stdout
+from multiprocessing import Process, Pipe
+from typing import List, Tuple
+
+from .mora import mora
+from .cache import SolutionCache
+from .output import ResultStream, MoraResult
+
+STATUS_OK = "ok"
+STATUS_FAILED = "failed"
+STATUS_TIMEOUT = "timeout"
+STATUS_CRASHED = "crashed"
+
+POLL_INTERVAL = 0.05
+
+
+class TaskResult:
+    def __init__(self, benchmark: str, goal: int):
+        self.benchmark: str = benchmark
+        self.goal: int = goal
+        self.status: str = STATUS_CRASHED
+        self.moments: List[str] = []
+        self.output: str = ""
+        self.time: float = 0.0
+        self.peak_memory: float = 0.0
+        self.error: str = ""
+        # The structured result sent by the worker, None if the task timed out or crashed
+        self.result: MoraResult = None
+
+    def as_mora_result(self) -> MoraResult:
+        """
+        Returns the structured result of the task with the status and the peak memory of the worker as extra fields
+        """
+        result = self.result or MoraResult(self.benchmark.split("/")[-1], self.goal)
+        if result.ok and self.status != STATUS_OK:
+            result.error = self.error
+        result.status = self.status
+        result.peak_memory = self.peak_memory
+        return result
+
+    def as_dict(self):
+        return {
+            "benchmark": self.benchmark,
+            "goal": self.goal,
+            "status": self.status,
+            "moments": self.moments,
+            "time": self.time,
+            "peak_memory": self.peak_memory,
+            "error": self.error,
+        }
+
+
+def run_task(connection, benchmark: str, goal: int, mora_args: dict, memory_limit: int, cache_args: tuple,
+             stream_path: str = None):
+    """
+    Runs MORA on a single (benchmark, goal) pair and sends the result through the given connection.
+    Is meant to be the target of a worker process. Solutions get appended to the result stream at the given path.
+    """
+    # The forked worker shares the address space of the parent, which must not count against the task
+    if memory_limit:
+        limit = address_space_size() + memory_limit * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    start_memory = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    result = TaskResult(benchmark, goal)
+    output = io.StringIO()
+    start = time.perf_counter()
+    try:
+        cache = SolutionCache(*cache_args) if cache_args else None
+        stream = ResultStream(stream_path, resume=True) if stream_path else None
+        with redirect_stdout(output):
+            result.result = mora(benchmark, goal=goal, cache=cache, stream=stream, structured=True, **mora_args)
+        if cache is not None:
+            cache.close()
+        if stream is not None:
+            stream.close()
+        result.status = STATUS_OK if result.result.ok else STATUS_FAILED
+        result.error = result.result.error or ""
+        result.moments = [f" E[{m}] = {e}" for m, e in result.result.moments.items() if m]
+    except MemoryError:
+        result.status = STATUS_FAILED
+        result.error = "Memory limit exceeded"
+    result.time = time.perf_counter() - start
+    # The growth of the maximum resident set size of the worker process, reported in KB on Linux. The maximum
+    # starts at the resident memory inherited from the parent, which is not part of the task.
+    result.peak_memory = (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - start_memory) / 1024
+    result.output = output.getvalue()
+    connection.send(result)
+    connection.close()
+
+
+def address_space_size() -> int:
+    """
+    Returns the size of the virtual address space of the calling process in bytes, 0 if it is unknown
+    """
+    try:
+        with open("/proc/self/statm") as file:
+            return int(file.read().split()[0]) * resource.getpagesize()
+    except OSError:
+        return 0
+
+
+def receive_result(receiver, process: Process, benchmark: str, goal: int) -> TaskResult:
+    """
+    Receives the result of a finished worker process. If the worker died without sending a result, a result for a
+    crashed task gets returned.
+    """
+    if receiver.poll():
+        try:
+            result = receiver.recv()
+            process.join()
+            return result
+        except EOFError:
+            pass
+    process.join()
+    result = TaskResult(benchmark, goal)
+    result.error = f"Worker exited with code {process.exitcode}"
+    return result
+
+
+def run_parallel(tasks: List[Tuple[str, int]], jobs: int, timeout: float = None, memory_limit: int = None,
+                 cache_args: tuple = None, stream_path: str = None, monomial_jobs: int = 1,
+                 **mora_args) -> List[TaskResult]:
+    """
+    Runs MORA on all given (benchmark, goal) pairs using at most jobs worker processes at a time. Every task may use
+    monomial_jobs processes to solve independent monomials in parallel.
+    The timeout is given in seconds and the memory limit in MB per task, the peak memory of a task is reported in MB.
+    Both only count the memory a task allocates on top of the memory its forked worker inherits from this process.
+    Returns the results in the order of the tasks.
+    """
+    mora_args["jobs"] = monomial_jobs
+    results: List[TaskResult] = [None] * len(tasks)
+    waiting = list(enumerate(tasks))
+    running = {}
+
+    while waiting or running:
+        while waiting and len(running) < jobs:
+            index, (benchmark, goal) = waiting.pop(0)
+            receiver, sender = Pipe(duplex=False)
+            process = Process(
+                target=run_task, args=(sender, benchmark, goal, mora_args, memory_limit, cache_args, stream_path)
+            )
+            process.start()
+            sender.close()
+            running[index] = (process, receiver, time.perf_counter())
+
+        for index, (process, receiver, start) in list(running.items()):
+            benchmark, goal = tasks[index]
+            result = None
+            if receiver.poll() or not process.is_alive():
+                result = receive_result(receiver, process, benchmark, goal)
+            elif timeout is not None and time.perf_counter() - start > timeout:
+                process.terminate()
+                process.join()
+                result = TaskResult(benchmark, goal)
+                result.status = STATUS_TIMEOUT
+                result.error = f"Timeout after {timeout}s"
+            if result is not None:
+                result.time = result.time or time.perf_counter() - start
+                results[index] = result
+                receiver.close()
+                del running[index]
+
+        if running:
+            time.sleep(POLL_INTERVAL)
+
+    return results
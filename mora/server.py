@@ -0,0 +1,289 @@
+"""This file is part of MORA
+
+This file contains a long-running analysis server, which accepts program sources and goals as JSON over HTTP on
+localhost. Parsed programs and their sessions are kept warm across requests, such that analyzing a program again only
+costs lookups in the stores of its session, and a program sent again under the same name after an edit reuses all
+results not affected by the edit. Requests run concurrently on a pool of worker threads and can be cancelled or
+limited by a timeout, both of which are checked before every monomial.
+
+Endpoints:
+    POST /analyze          {"source": ..., "goals": [1, 2], "name": ..., "solver": ..., "timeout": ..., "wait": true}
+    GET /requests/<id>     the state and, once finished, the results of a request
+    DELETE /requests/<id>  cancels a request
+    GET /status            the number of warm programs and of requests by status
+"""
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, Future
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Dict, List, Optional, Tuple
+
+from .core import Session, AnalysisCancelled, SOLVER_SUMMATION, SOLVER_LINEAR
+from .cache import SolutionCache
+from .input import InputParser
+from .output import MoraResult
+from .runner import STATUS_OK, STATUS_FAILED, STATUS_TIMEOUT
+
+STATUS_QUEUED = "queued"
+STATUS_RUNNING = "running"
+STATUS_CANCELLED = "cancelled"
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_WORKERS = 4
+DEFAULT_MAX_PROGRAMS = 64
+DEFAULT_MAX_REQUESTS = 1000
+
+
+class AnalysisRequest:
+    """
+    A request to analyze a program for some goals. The results hold a MoraResult per goal once the request is done.
+    """
+
+    def __init__(self, request_id: str, name: str, goals: List[int], timeout: Optional[float]):
+        self.id: str = request_id
+        self.name: str = name
+        self.goals: List[int] = goals
+        self.timeout: Optional[float] = timeout
+        self.status: str = STATUS_QUEUED
+        self.error: Optional[str] = None
+        self.results: List[MoraResult] = []
+        self.submit_time: float = time.time()
+        self.time: float = 0.0
+        self.cancel_event = threading.Event()
+        self.future: Future = None
+
+    @property
+    def done(self) -> bool:
+        return self.status not in (STATUS_QUEUED, STATUS_RUNNING)
+
+    def as_dict(self):
+        return {
+            "id": self.id,
+            "name": self.name,
+            "goals": self.goals,
+            "status": self.status,
+            "error": self.error,
+            "time": self.time,
+            "results": [result.as_dict() for result in self.results],
+        }
+
+
+class AnalysisServer:
+    """
+    Runs analysis requests on a pool of worker threads. The sessions of the last max_programs programs are kept, keyed
+    by source and solver, together with the latest program of every name for incremental updates. The last
+    max_requests finished requests can still be queried.
+    """
+
+    def __init__(self, workers: int = DEFAULT_WORKERS, timeout: float = None, cache: SolutionCache = None,
+                 max_programs: int = DEFAULT_MAX_PROGRAMS, max_requests: int = DEFAULT_MAX_REQUESTS):
+        self.timeout = timeout
+        self.cache = cache
+        self.max_programs = max_programs
+        self.max_requests = max_requests
+        self.pool = ThreadPoolExecutor(workers)
+        self.sessions: Dict[Tuple[str, str], Session] = OrderedDict()
+        self.latest: Dict[Tuple[str, str], Session] = {}
+        self.requests: Dict[str, AnalysisRequest] = OrderedDict()
+        self.lock = threading.Lock()
+        self.next_id = 0
+        self.session_hits = 0
+        self.session_misses = 0
+
+    def submit(self, source: str, goals: List[int], name: str = None, solver: str = SOLVER_SUMMATION,
+               timeout: float = None) -> AnalysisRequest:
+        """
+        Queues a request to analyze the given source for the given goals. Without a timeout the default timeout
+        of the server applies.
+        """
+        if solver not in (SOLVER_SUMMATION, SOLVER_LINEAR):
+            raise ValueError(f"Unknown solver {solver}")
+        with self.lock:
+            self.next_id += 1
+            request = AnalysisRequest(str(self.next_id), name or "from_text", list(goals), timeout or self.timeout)
+            self.requests[request.id] = request
+            self.evict_requests()
+            request.future = self.pool.submit(self.run, request, source, solver)
+        return request
+
+    def get(self, request_id: str) -> Optional[AnalysisRequest]:
+        with self.lock:
+            return self.requests.get(request_id)
+
+    def cancel(self, request_id: str) -> Optional[AnalysisRequest]:
+        """
+        Cancels a request. A queued request never starts, a running one stops before its next monomial.
+        """
+        request = self.get(request_id)
+        if request is not None and not request.done:
+            request.cancel_event.set()
+            if request.future.cancel():
+                request.status = STATUS_CANCELLED
+        return request
+
+    def status(self) -> dict:
+        with self.lock:
+            statuses = {}
+            for request in self.requests.values():
+                statuses[request.status] = statuses.get(request.status, 0) + 1
+            lookups = self.session_hits + self.session_misses
+            return {
+                "programs": len(self.sessions),
+                "requests": statuses,
+                "session_hits": self.session_hits,
+                "session_misses": self.session_misses,
+                "session_hit_rate": self.session_hits / lookups if lookups else 0.0,
+            }
+
+    def shutdown(self):
+        for request in list(self.requests.values()):
+            request.cancel_event.set()
+        self.pool.shutdown(wait=True, cancel_futures=True)
+
+    def run(self, request: AnalysisRequest, source: str, solver: str):
+        """
+        Analyzes the source of a request in a worker thread
+        """
+        if request.cancel_event.is_set():
+            request.status = STATUS_CANCELLED
+            return
+        request.status = STATUS_RUNNING
+        start = time.perf_counter()
+        # Parsing and waiting for a session used by another request count against the timeout as well
+        deadline = time.monotonic() + request.timeout if request.timeout is not None else None
+        try:
+            session, parse_time = self.get_session(source, request.name, solver)
+            for goal in request.goals:
+                result = MoraResult(request.name, goal)
+                result.parse_time = parse_time
+                goal_start = time.perf_counter()
+                timeout = max(deadline - time.monotonic(), 0) if deadline is not None else None
+                result.moments = dict(session.solve_goals(None, goal, timeout, request.cancel_event))
+                result.monomial_stats = session.get_monomial_stats(result.moments)
+                result.time = time.perf_counter() - goal_start
+                request.results.append(result)
+            status = STATUS_OK
+        except AnalysisCancelled as exception:
+            status = STATUS_CANCELLED if request.cancel_event.is_set() else STATUS_TIMEOUT
+            request.error = str(exception)
+        except Exception as exception:
+            status = STATUS_FAILED
+            request.error = str(exception) or type(exception).__name__
+        request.time = time.perf_counter() - start
+        # The status is set last, such that a finished request is complete once it is seen as done
+        request.status = status
+
+    def get_session(self, source: str, name: str, solver: str) -> Tuple[Session, float]:
+        """
+        Returns the warm session for the given source and the time it took to parse the source, which is zero for
+        warm sessions. A new session for an edited program reuses the unaffected results of the latest program with
+        the same name, unless that program is still being analyzed by another request, which is not waited for.
+        """
+        key = (hashlib.sha256(source.encode()).hexdigest(), solver)
+        with self.lock:
+            session = self.sessions.get(key)
+            if session is not None:
+                self.sessions.move_to_end(key)
+                self.session_hits += 1
+                return session, 0.0
+            self.session_misses += 1
+            previous = self.latest.get((name, solver))
+
+        start = time.perf_counter()
+        parser = InputParser()
+        parser.set_source(source)
+        program = parser.parse_source()
+        program.name = name
+        parse_time = time.perf_counter() - start
+        session = Session(program, solver, self.cache)
+        if previous is not None and previous.lock.acquire(blocking=False):
+            try:
+                session.reuse(previous)
+            finally:
+                previous.lock.release()
+
+        with self.lock:
+            # Another request for the same source might have created a session in the meantime
+            session = self.sessions.setdefault(key, session)
+            self.latest[(name, solver)] = session
+            while len(self.sessions) > self.max_programs:
+                _, evicted = self.sessions.popitem(last=False)
+                self.latest = {k: s for k, s in self.latest.items() if s is not evicted}
+        return session, parse_time
+
+    def evict_requests(self):
+        finished = [r.id for r in self.requests.values() if r.done]
+        for request_id in finished[:max(len(self.requests) - self.max_requests, 0)]:
+            del self.requests[request_id]
+
+
+class AnalysisRequestHandler(BaseHTTPRequestHandler):
+    """
+    Translates HTTP requests to calls of the analysis server, which is attached to the HTTP server
+    """
+
+    def do_POST(self):
+        if self.path != "/analyze":
+            return self.send_json(404, {"error": f"Unknown path {self.path}"})
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            data = json.loads(self.rfile.read(length) or b"{}")
+            request = self.server.analysis.submit(
+                data["source"], data.get("goals", [1]), data.get("name"), data.get("solver", SOLVER_SUMMATION),
+                data.get("timeout")
+            )
+        except (ValueError, KeyError, TypeError) as exception:
+            return self.send_json(400, {"error": f"Invalid request: {exception}"})
+        if not data.get("wait", True):
+            return self.send_json(202, {"id": request.id, "status": request.status})
+        try:
+            request.future.result()
+        except Exception:
+            # Cancelled before it started, the status of the request says so
+            pass
+        self.send_json(200, request.as_dict())
+
+    def do_GET(self):
+        if self.path == "/status":
+            return self.send_json(200, self.server.analysis.status())
+        request = self.server.analysis.get(self.get_request_id())
+        if request is None:
+            return self.send_json(404, {"error": f"Unknown request {self.path}"})
+        self.send_json(200, request.as_dict())
+
+    def do_DELETE(self):
+        request = self.server.analysis.cancel(self.get_request_id())
+        if request is None:
+            return self.send_json(404, {"error": f"Unknown request {self.path}"})
+        self.send_json(200, {"id": request.id, "status": request.status})
+
+    def get_request_id(self) -> Optional[str]:
+        prefix = "/requests/"
+        return self.path[len(prefix):] if self.path.startswith(prefix) else None
+
+    def send_json(self, code: int, data: dict):
+        body = json.dumps(data).encode()
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Requests are not logged to keep the output of the server quiet
+        pass
+
+
+def create_server(analysis: AnalysisServer, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT) -> ThreadingHTTPServer:
+    """
+    Returns an HTTP server for the given analysis server. Use port 0 to pick a free port.
+    """
+    server = ThreadingHTTPServer((host, port), AnalysisRequestHandler)
+    server.daemon_threads = True
+    server.analysis = analysis
+    return server
@@ -0,0 +1,89 @@
+"""This file is part of MORA
+
+This file contains a benchmark suite tracking the performance of MORA over time. Every (benchmark, goal) pair runs
+in its own worker process, its wall time, peak memory (on top of the memory inherited from the suite) and number
+of solved monomials get recorded and can be stored as JSON baseline. Later runs get compared against a baseline to
+flag slowdowns and failures.
+"""
+
+import json
+import os
+from typing import Dict, List
+
+from .runner import run_parallel, TaskResult, STATUS_OK
+
+DEFAULT_THRESHOLD = 0.25
+DEFAULT_MIN_TIME = 0.5
+DEFAULT_MIN_MEMORY = 10.0
+
+
+class Regression:
+    def __init__(self, key: str, kind: str, baseline, current):
+        self.key: str = key
+        self.kind: str = kind
+        self.baseline = baseline
+        self.current = current
+
+    def __str__(self):
+        if self.kind == "status":
+            return f"{self.key}: {self.baseline} -> {self.current}"
+        return f"{self.key}: {self.kind} {self.baseline:.2f} -> {self.current:.2f} " \
+               f"(+{(self.current / self.baseline - 1) * 100:.0f}%)"
+
+
+def result_key(benchmark: str, goal: int) -> str:
+    return f"{os.path.basename(benchmark)}:{goal}"
+
+
+def result_entry(result: TaskResult) -> dict:
+    return {
+        "status": result.status,
+        "time": result.time,
+        "peak_memory": result.peak_memory,
+        "monomials": len(result.moments),
+        "error": result.error,
+    }
+
+
+def run_suite(benchmarks: List[str], goals: List[int], jobs: int = 1, timeout: float = None,
+              memory_limit: int = None, **mora_args) -> Dict[str, dict]:
+    """
+    Runs MORA on all benchmarks for all goals and returns the measurements keyed by "benchmark:goal"
+    """
+    tasks = [(benchmark, goal) for benchmark in benchmarks for goal in goals]
+    results = run_parallel(tasks, jobs, timeout, memory_limit, output_format="", **mora_args)
+    return {result_key(r.benchmark, r.goal): result_entry(r) for r in results}
+
+
+def save_baseline(path: str, results: Dict[str, dict], **settings):
+    with open(path, "w") as file:
+        json.dump({"settings": settings, "results": results}, file, indent=2, sort_keys=True)
+
+
+def load_baseline(path: str) -> Dict[str, dict]:
+    with open(path) as file:
+        return json.load(file)["results"]
+
+
+def compare_to_baseline(baseline: Dict[str, dict], results: Dict[str, dict], threshold: float = DEFAULT_THRESHOLD,
+                        min_time: float = DEFAULT_MIN_TIME, min_memory: float = DEFAULT_MIN_MEMORY) -> List[Regression]:
+    """
+    Returns all regressions of the results with respect to the baseline. A pair regresses if it succeeded in the
+    baseline but not anymore, or if its time or peak memory grew by more than the relative threshold. Slowdowns of
+    less than min_time seconds and memory growths of less than min_memory MB are ignored, as they are dominated by
+    noise.
+    """
+    regressions = []
+    for key, current in results.items():
+        if key not in baseline or baseline[key]["status"] != STATUS_OK:
+            continue
+        old = baseline[key]
+        if current["status"] != STATUS_OK:
+            regressions.append(Regression(key, "status", old["status"], current["status"]))
+            continue
+        if current["time"] > old["time"] * (1 + threshold) and current["time"] - old["time"] >= min_time:
+            regressions.append(Regression(key, "time", old["time"], current["time"]))
+        if current["peak_memory"] > old["peak_memory"] * (1 + threshold) and \
+                current["peak_memory"] - old["peak_memory"] >= min_memory:
+            regressions.append(Regression(key, "peak_memory", old["peak_memory"], current["peak_memory"]))
+    return regressions
@@ -1,8 +1,10 @@
-from typing import Iterable
+from typing import Iterable, Tuple, Dict, List
 
-from diofant import sympify, Rational, Poly, prod, Symbol, symbols
-from scipy.stats import norm
-from math import sqrt
+from collections import OrderedDict
+from functools import lru_cache
+from weakref import WeakValueDictionary
+
+from diofant import sympify, Rational, Poly, prod, Symbol, symbols, Expr, expand, ff, binomial, factorial
 import re
 
 LOG_NOTHING = 0
@@ -56,41 +58,127 @@ class Update:
         return sum(prob * (exp ** k) for exp, prob in self.branches)
 
 
+MOMENT_CACHE_SIZE = 128
+
+
 class RandomVar:
+    """
+    A random variable given by a distribution and its parameters, which can be numbers or symbols.
+    Moments are computed exactly, mostly by recurrences in the order of the moment, and every random variable
+    keeps the moments it computed in a small LRU cache.
+    """
+
     def __init__(self, distribution, parameters, var_name=None):
         self.distribution = distribution
-        self.parameters = parameters
+        self.parameters = parameters if distribution == 'finite' else [sympify(p) for p in parameters]
         self.var_name = var_name
+        self.moments: Dict[int, Expr] = OrderedDict()
+        if distribution not in MOMENT_FUNCTIONS:
+            raise Exception(f"Distribution {distribution} is not supported")
 
     def compute_moment(self, k):
-        if self.distribution == 'finite':
-            return sum([p * (b ** k) for b, p in self.parameters])
-
-        if self.distribution == 'uniform':
-            l, u = self.parameters
-            return (u**(k+1)-l**(k+1))/((k+1)*(u-l))
-
-        if self.distribution == 'gauss' or self.distribution == 'normal':
-            mu, sigma_squared = self.parameters
-            # For low moments avoid scipy.stats.moments as it does not support
-            # parametric parameters. In the future get all moments directly,
-            # using the following properties:
-            # https://math.stackexchange.com/questions/1945448/methods-for-finding-raw-moments-of-the-normal-distribution
-            if k == 0:
-                return 1
-            elif k == 1:
-                return mu
-            elif k == 2:
-                return mu**2 + sigma_squared
-            elif k == 3:
-                return mu*(mu**2 + 3*sigma_squared)
-            elif k == 4:
-                return mu**4 + 6*mu**2*sigma_squared + 3*sigma_squared**2
-            moment = norm(loc=mu, scale=sqrt(sigma_squared)).moment(k)
-            return Rational(moment)
-
-        if self.distribution == 'unknown':
-            return sympify(f"{self.var_name}(0)^{k}")
+        if k in self.moments:
+            self.moments.move_to_end(k)
+            return self.moments[k]
+        moment = MOMENT_FUNCTIONS[self.distribution](self, k)
+        self.cache_moment(k, moment)
+        return moment
+
+    def cache_moment(self, k, moment):
+        self.moments[k] = moment
+        if len(self.moments) > MOMENT_CACHE_SIZE:
+            self.moments.popitem(last=False)
+
+    def recurrent_moment(self, k, step):
+        """
+        Computes the k-th moment from the lower moments, given a function mapping j and the moments 0, ..., j-1 to
+        the j-th moment. Lower moments are taken from the cache where possible and cached as well.
+        """
+        moments = [sympify(1)]
+        for j in range(1, k + 1):
+            moment = self.moments.get(j)
+            if moment is None:
+                moment = expand(step(j, moments))
+                if j < k:
+                    self.cache_moment(j, moment)
+            moments.append(moment)
+        return moments[k]
+
+    def finite_moment(self, k):
+        return sum([p * (b ** k) for b, p in self.parameters])
+
+    def uniform_moment(self, k):
+        l, u = self.parameters
+        return (u**(k+1)-l**(k+1))/((k+1)*(u-l))
+
+    def gauss_moment(self, k):
+        # E[X^j] = mu E[X^(j-1)] + (j-1) sigma^2 E[X^(j-2)]
+        mu, sigma_squared = self.parameters
+        return self.recurrent_moment(k, lambda j, m: mu * m[j-1] + (j-1) * sigma_squared * (m[j-2] if j > 1 else 0))
+
+    def bernoulli_moment(self, k):
+        p, = self.parameters
+        return sympify(1) if k == 0 else p
+
+    def binomial_moment(self, k):
+        # E[X^k] = sum_j S(k, j) n(n-1)...(n-j+1) p^j with S the Stirling numbers of the second kind
+        n, p = self.parameters
+        return expand(sum(s * ff(n, j) * p**j for j, s in enumerate(stirling_numbers(k))))
+
+    def poisson_moment(self, k):
+        # E[X^k] = sum_j S(k, j) lambda^j with S the Stirling numbers of the second kind
+        rate, = self.parameters
+        return expand(sum(s * rate**j for j, s in enumerate(stirling_numbers(k))))
+
+    def exponential_moment(self, k):
+        # E[X^j] = j / lambda E[X^(j-1)]
+        rate, = self.parameters
+        return self.recurrent_moment(k, lambda j, m: j * m[j-1] / rate)
+
+    def gamma_moment(self, k):
+        # E[X^j] = (alpha + j - 1) theta E[X^(j-1)]
+        shape, scale = self.parameters
+        return self.recurrent_moment(k, lambda j, m: (shape + j - 1) * scale * m[j-1])
+
+    def beta_moment(self, k):
+        # E[X^j] = (a + j - 1) / (a + b + j - 1) E[X^(j-1)]
+        a, b = self.parameters
+        return self.recurrent_moment(k, lambda j, m: (a + j - 1) / (a + b + j - 1) * m[j-1])
+
+    def laplace_moment(self, k):
+        # The central moments are E[(X - mu)^j] = j! b^j for even j and 0 for odd j
+        mu, b = self.parameters
+        return expand(sum(binomial(k, j) * mu**(k-j) * factorial(j) * b**j for j in range(0, k + 1, 2)))
+
+    def unknown_moment(self, k):
+        return sympify(f"{self.var_name}(0)^{k}")
+
+
+MOMENT_FUNCTIONS = {
+    'finite': RandomVar.finite_moment,
+    'uniform': RandomVar.uniform_moment,
+    'gauss': RandomVar.gauss_moment,
+    'normal': RandomVar.gauss_moment,
+    'bernoulli': RandomVar.bernoulli_moment,
+    'binomial': RandomVar.binomial_moment,
+    'poisson': RandomVar.poisson_moment,
+    'exponential': RandomVar.exponential_moment,
+    'gamma': RandomVar.gamma_moment,
+    'beta': RandomVar.beta_moment,
+    'laplace': RandomVar.laplace_moment,
+    'unknown': RandomVar.unknown_moment,
+}
+
+
+@lru_cache(maxsize=None)
+def stirling_numbers(k: int) -> Tuple[int, ...]:
+    """
+    Returns the Stirling numbers of the second kind S(k, 0), ..., S(k, k)
+    """
+    if k == 0:
+        return 1,
+    previous = stirling_numbers(k - 1) + (0,)
+    return tuple(j * previous[j] + (previous[j-1] if j > 0 else 0) for j in range(k + 1))
 
 
 def EV(expression):
@@ -100,48 +188,126 @@ def EV(expression):
         return expression
 
 
-def get_exponent_of(var, mono):
-    monoms = mono.as_poly([var]).monoms()
-    if len(monoms) > 0 and len(monoms[0]) > 0:
-        return monoms[0][0]
-    return 0
+class Monomial:
+    """
+    A monomial over the program variables, represented by its vector of exponents with respect to the fixed order
+    of the program variables. Polynomials are represented as dicts from monomials to coefficients.
+    Monomials are interned, i.e. there is only one instance per exponent vector in use, such that store lookups mostly
+    compare by identity. The table only holds weak references, monomials no longer used by any session get freed.
+    """
+    __slots__ = ("exponents", "hash", "__weakref__")
+
+    interned: "WeakValueDictionary[Tuple[int, ...], Monomial]" = WeakValueDictionary()
+
+    def __new__(cls, exponents: Tuple[int, ...]):
+        exponents = tuple(exponents)
+        monomial = cls.interned.get(exponents)
+        if monomial is None:
+            monomial = super().__new__(cls)
+            monomial.exponents = exponents
+            monomial.hash = hash(exponents)
+            cls.interned[exponents] = monomial
+        return monomial
 
+    def __reduce__(self):
+        return Monomial, (self.exponents,)
 
-def get_monoms(poly: Poly):
+    def __hash__(self):
+        return self.hash
+
+    def __eq__(self, other):
+        return isinstance(other, Monomial) and self.exponents == other.exponents
+
+    def __repr__(self):
+        return f"Monomial{self.exponents}"
+
+    def __mul__(self, other):
+        return Monomial(tuple(a + b for a, b in zip(self.exponents, other.exponents)))
+
+    def without(self, index: int):
+        """
+        Returns the monomial with the variable at the given index removed
+        """
+        return Monomial(self.exponents[:index] + (0,) + self.exponents[index + 1:])
+
+    def is_constant(self):
+        return not any(self.exponents)
+
+    def is_multiple_of(self, other):
+        """
+        Returns true iff the monomial is divisible by the other monomial
+        """
+        return all(a >= b for a, b in zip(self.exponents, other.exponents))
+
+    def as_expr(self, variables):
+        return prod(var ** power for var, power in zip(variables, self.exponents) if power > 0)
+
+    @classmethod
+    def constant(cls, number_of_variables: int):
+        return cls((0,) * number_of_variables)
+
+
+def poly_to_terms(poly: Poly) -> Dict[Monomial, Expr]:
     """
-    Returns the list of monoms for a given polynomial
+    Returns the sparse representation of a given polynomial as dict from monomials to coefficients
     """
-    monoms = []
-    for powers in poly.monoms():
-        m = prod(var ** power for var, power in zip(poly.gens, powers))
-        if m != 1:
-            monoms.append(m.as_poly(poly.gens))
-    return monoms
+    return {Monomial(powers): coeff for powers, coeff in poly.terms()}
 
 
-def monomial_is_constant(monomial: Poly):
+def expr_to_terms(expression: Expr, variables) -> Dict[Monomial, Expr]:
     """
-    Returns true iff the given monomial is constant
+    Returns the sparse representation of a given polynomial expression in the given variables
     """
-    if monomial.is_zero:
-        return True
-    powers = monomial.monoms()[0]
-    return all(p == 0 for p in powers)
+    return poly_to_terms(sympify(expression).as_poly(variables))
 
 
-def is_independent_from_all(program, x, ys):
+def terms_to_expr(terms: Dict[Monomial, Expr], variables) -> Expr:
     """
-    Returns true iff x is statistially independent from all ys, where x is from the current iteration and the ys
-    are from the previous iteration.
+    Converts the sparse representation of a polynomial back to an expression
     """
-    if x not in program.ancestors[x]:
-        return True
+    return sympify(sum(coeff * monomial.as_expr(variables) for monomial, coeff in terms.items()))
 
-    for y in ys:
-        if y in program.dependencies[x]:
-            return False
 
-    return True
+def add_term(terms: Dict[Monomial, Expr], monomial: Monomial, coeff: Expr):
+    """
+    Adds a term to the sparse representation of a polynomial in place, merging it with a term of the same monomial
+    """
+    if monomial in terms:
+        terms[monomial] += coeff
+    else:
+        terms[monomial] = coeff
+
+
+def variable_mask(program, variables):
+    """
+    Returns the bitmask of the given program variables with respect to their indices in the program
+    """
+    mask = 0
+    for variable in variables:
+        mask |= 1 << program.variable_indices[variable]
+    return mask
+
+
+def mask_to_indices(mask: int):
+    """
+    Returns the indices of all bits which are set in the given bitmask
+    """
+    indices = []
+    while mask:
+        lowest = mask & -mask
+        indices.append(lowest.bit_length() - 1)
+        mask ^= lowest
+    return indices
+
+
+def is_independent_from_all(program, x, ys_mask: int):
+    """
+    Returns true iff x is statistially independent from all ys given by their bitmask, where x is from the
+    current iteration and the ys are from the previous iteration.
+    """
+    if not program.ancestors[x] & variable_mask(program, [x]):
+        return True
+    return not program.dependencies[x] & ys_mask
 
 
 def all_are_independent_from_all(program, xs, ys):
@@ -149,27 +315,13 @@ def all_are_independent_from_all(program, xs, ys):
     Returns true iff all xs are statistially independent from all ys, where the xs are from the current iteration
     and the ys are from the previous iteration.
     """
+    ys_mask = variable_mask(program, ys)
     for x in xs:
-        if not is_independent_from_all(program, x, ys):
+        if not is_independent_from_all(program, x, ys_mask):
             return False
     return True
 
 
-def get_powers_of_variable_in_polynomial(variable: Symbol, polynomial: Poly):
-    """
-    Returns the set of all powers p for which variable ** p occurs in the polynomial
-    """
-    monoms = get_monoms(polynomial)
-    all_powers = []
-    for monomial in monoms:
-        powers = monomial.monoms()[0]
-        powers_for_var = {var: power for var, power in zip(monomial.gens, powers) if power > 0}
-        if variable in powers_for_var.keys():
-            all_powers.append(powers_for_var[variable])
-    all_powers.sort(reverse=True)
-    return all_powers
-
-
 def set_log_level(log_level):
     global LOG_LEVEL
     LOG_LEVEL = log_level
@@ -0,0 +1,87 @@
+"""This file is part of MORA
+
+This runnable script measures the startup cost of parsing prob-solvable programs. It compares building a fresh
+Earley parser for every program from the original grammar (as MORA did before), which is kept in
+parser_benchmark_earley.lark, with the shared LALR parser whose grammar is cached on disk. Only programs which
+both grammars accept are part of the sweep. For the command line arguments run the script with "--help".
+"""
+import glob
+import os
+from argparse import ArgumentParser
+from timeit import default_timer as timer
+from lark import Lark
+import mora.input
+from mora.input import get_lark_parser
+
+EARLEY_GRAMMAR_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "parser_benchmark_earley.lark")
+
+parser = ArgumentParser(description="Measure the time MORA spends on parsing a sweep of programs")
+
+parser.add_argument(
+    "--benchmarks",
+    dest="benchmarks",
+    type=str,
+    nargs="+",
+    default=["benchmarks/*", "benchmarks_bns/*"],
+    help="A list of programs to parse"
+)
+
+parser.add_argument(
+    "--files",
+    dest="files",
+    type=int,
+    default=50,
+    help="The number of files in the sweep, programs get repeated if there are fewer"
+)
+
+
+def load_sources(patterns, number, earley_grammar):
+    grammar_parser = get_lark_parser()
+    earley_parser = Lark(earley_grammar)
+    sources = []
+    for path in sorted(b for bs in map(glob.glob, patterns) for b in bs):
+        try:
+            with open(path) as file:
+                source = file.read()
+            grammar_parser.parse(source)
+            earley_parser.parse(source)
+            sources.append(source)
+        except Exception:
+            # Skip files which are not prob-solvable programs
+            continue
+    if not sources:
+        raise Exception("No parsable programs found")
+    return [sources[i % len(sources)] for i in range(number)]
+
+
+def sweep_fresh_earley(grammar, sources):
+    start = timer()
+    for source in sources:
+        Lark(grammar).parse(source)
+    return timer() - start
+
+
+def sweep_shared_lalr(sources):
+    mora.input.lark_parser = None
+    start = timer()
+    for source in sources:
+        get_lark_parser().parse(source)
+    return timer() - start
+
+
+def main():
+    args = parser.parse_args()
+    with open(EARLEY_GRAMMAR_FILE) as file:
+        earley_grammar = file.read()
+    sources = load_sources(args.benchmarks, args.files, earley_grammar)
+
+    fresh = sweep_fresh_earley(earley_grammar, sources)
+    shared = sweep_shared_lalr(sources)
+    print(f"Parsing {len(sources)} programs")
+    print(f"Fresh Earley parser per program (original grammar): {fresh:.3f}s ({fresh / len(sources) * 1000:.1f}ms per program)")
+    print(f"Shared cached LALR parser:                          {shared:.3f}s ({shared / len(sources) * 1000:.1f}ms per program)")
+    print(f"Speedup: {fresh / shared:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,8 +4,12 @@ This runnable script allows the user to run MORA on probabilistic programs store
 For the command line arguments run the script with "--help".
 """
 import glob
+from fractions import Fraction
 from argparse import ArgumentParser
-from mora.mora import mora
+# Only the dependency-free constants are imported here, MORA itself gets loaded after the arguments are parsed,
+# such that --help and invalid arguments do not pay for importing diofant
+from mora.constants import SOLVER_SUMMATION, SOLVER_LINEAR, DEFAULT_CACHE_PATH, DEFAULT_CACHE_SIZE, \
+    DEFAULT_PROFILE_PATH, DEFAULT_STREAM_PATH
 
 parser = ArgumentParser(description="Run MORA on probabilistic programs stored in files")
 
@@ -36,14 +40,240 @@ parser.add_argument(
     help="The format in which MORA should present the output"
 )
 
+parser.add_argument(
+    "--solver",
+    dest="solver",
+    type=str,
+    choices=[SOLVER_SUMMATION, SOLVER_LINEAR],
+    default=SOLVER_SUMMATION,
+    help="The backend MORA should use to solve the recurrences of the moments (linear is an alias of summation)"
+)
+
+parser.add_argument(
+    "--cache",
+    dest="cache",
+    type=str,
+    nargs="?",
+    const=DEFAULT_CACHE_PATH,
+    default=None,
+    help=f"Persistently cache solutions in the given file (default {DEFAULT_CACHE_PATH}) and reuse them across runs"
+)
+
+parser.add_argument(
+    "--cache_size",
+    dest="cache_size",
+    type=int,
+    default=DEFAULT_CACHE_SIZE,
+    help="The maximal number of entries in the persistent cache before the least recently used ones get evicted"
+)
+
+parser.add_argument(
+    "--separate_goals",
+    dest="separate_goals",
+    action="store_true",
+    help="Solve every goal from scratch instead of reusing the moments computed for other goals"
+)
+
+parser.add_argument(
+    "--jobs",
+    dest="jobs",
+    type=int,
+    default=1,
+    help="The number of worker processes. With more than one job every (benchmark, goal) pair runs in its own process"
+)
+
+parser.add_argument(
+    "--monomial_jobs",
+    dest="monomial_jobs",
+    type=int,
+    default=1,
+    help="The number of worker processes used to solve independent monomials of a single program in parallel"
+)
+
+parser.add_argument(
+    "--timeout",
+    dest="timeout",
+    type=float,
+    default=None,
+    help="The maximal time in seconds a single (benchmark, goal) pair may take when running with multiple jobs"
+)
+
+parser.add_argument(
+    "--memory_limit",
+    dest="memory_limit",
+    type=int,
+    default=None,
+    help="The maximal memory in MB a single (benchmark, goal) pair may use when running with multiple jobs"
+)
+
+parser.add_argument(
+    "--results",
+    dest="results",
+    type=str,
+    default=None,
+    help="A file the results get written to, as JSON if it ends with .json and pickled otherwise. "
+         "With multiple jobs every result also contains the status and the peak memory of its task"
+)
+
+parser.add_argument(
+    "--profile",
+    dest="profile",
+    type=str,
+    nargs="?",
+    const=DEFAULT_PROFILE_PATH,
+    default=None,
+    help=f"Profile the phases of every monomial and write the data to the given path (default {DEFAULT_PROFILE_PATH}) "
+         f"with the extensions .json and .folded (for flame graphs)"
+)
+
+parser.add_argument(
+    "--numeric",
+    dest="numeric",
+    type=int,
+    default=None,
+    help="Evaluate the moments numerically for n up to the given number of iterations instead of computing closed forms"
+)
+
+parser.add_argument(
+    "--parameters",
+    dest="parameters",
+    type=str,
+    nargs="+",
+    default=[],
+    help="Values of the parameters for numeric evaluation in the form name=value, e.g. p=1/2 or x(0)=1"
+)
+
+parser.add_argument(
+    "--exact",
+    dest="exact",
+    action="store_true",
+    help="Use exact rational arithmetic instead of floating point numbers for numeric evaluation"
+)
+
+parser.add_argument(
+    "--stream",
+    dest="stream",
+    type=str,
+    nargs="?",
+    const=DEFAULT_STREAM_PATH,
+    default=None,
+    help=f"Write every solved monomial as JSON line to the given file (default {DEFAULT_STREAM_PATH}) as soon as it "
+         f"is solved"
+)
+
+parser.add_argument(
+    "--resume",
+    dest="resume",
+    action="store_true",
+    help="Keep the records of a previous run in the stream file and do not solve the recorded monomials again"
+)
+
+parser.add_argument(
+    "--dry-run",
+    dest="dry_run",
+    action="store_true",
+    help="Only plan the goals and print the number of needed monomials and the estimated cost, without solving"
+)
+
+parser.add_argument(
+    "--max_monomials",
+    dest="max_monomials",
+    type=int,
+    default=None,
+    help="Plan every goal first and skip it without solving if it needs more monomials than this"
+)
+
 
 def main():
     args = parser.parse_args()
+    from mora.mora import mora, mora_goals, mora_numeric, mora_plan
+    from mora.cache import SolutionCache
+    from mora.profiler import start_profiling, stop_profiling
+    from mora.output import ResultStream, write_results
     args.benchmarks = [b for bs in map(glob.glob, args.benchmarks) for b in bs]
 
+    if args.dry_run:
+        cache = SolutionCache(args.cache, args.cache_size) if args.cache else None
+        for benchmark in args.benchmarks:
+            mora_plan(benchmark, args.goals, cache, args.max_monomials)
+        if cache is not None:
+            cache.close()
+        return
+
+    if args.jobs > 1:
+        if args.profile:
+            parser.error("--profile is not supported with more than one job")
+        if args.numeric is not None:
+            parser.error("--numeric is not supported with more than one job")
+        run_jobs(args)
+        return
+
+    if args.numeric is not None:
+        parameters = dict(p.split("=", 1) for p in args.parameters)
+        if not args.exact:
+            parameters = {name: float(Fraction(value)) for name, value in parameters.items()}
+        for benchmark in args.benchmarks:
+            for goal in args.goals:
+                mora_numeric(benchmark, goal, args.numeric, parameters, args.exact)
+        return
+
+    cache = SolutionCache(args.cache, args.cache_size) if args.cache else None
+    stream = ResultStream(args.stream, args.resume) if args.stream else None
+    if args.profile:
+        start_profiling()
+
+    structured = args.results is not None
+    results = []
     for benchmark in args.benchmarks:
-        for goal in args.goals:
-            mora(benchmark, goal=goal, output_format=args.output_format)
+        if args.separate_goals:
+            for goal in args.goals:
+                out = mora(
+                    benchmark, goal=goal, output_format=args.output_format, solver=args.solver, cache=cache,
+                    jobs=args.monomial_jobs, stream=stream, structured=structured, max_monomials=args.max_monomials
+                )
+                results.append(out)
+        else:
+            outs = mora_goals(
+                benchmark, goals=args.goals, output_format=args.output_format, solver=args.solver, cache=cache,
+                jobs=args.monomial_jobs, stream=stream, structured=structured, max_monomials=args.max_monomials
+            )
+            results.extend(outs.values() if outs else [])
+
+    if structured:
+        for result in results:
+            if not result.ok:
+                print(f"Execution failed for {result.benchmark} (goal {result.goal})!")
+                print(result.error)
+        write_results(results, args.results)
+
+    if cache is not None:
+        cache.close()
+    if stream is not None:
+        stream.close()
+    if args.profile:
+        stop_profiling().write(args.profile)
+        print(f"Profile written to {args.profile}.json and {args.profile}.folded")
+
+
+def run_jobs(args):
+    from mora.runner import run_parallel, STATUS_OK
+    from mora.output import ResultStream, write_results
+    tasks = [(benchmark, goal) for benchmark in args.benchmarks for goal in args.goals]
+    cache_args = (args.cache, args.cache_size) if args.cache else None
+    if args.stream and not args.resume:
+        # Start a fresh stream file which all workers append to
+        ResultStream(args.stream).close()
+    results = run_parallel(
+        tasks, args.jobs, args.timeout, args.memory_limit, cache_args, args.stream,
+        args.monomial_jobs, output_format=args.output_format, solver=args.solver, max_monomials=args.max_monomials
+    )
+    for result in results:
+        print(result.output, end="")
+        if result.status != STATUS_OK:
+            print(f"{result.benchmark} (goal {result.goal}): {result.status}, {result.error}")
+
+    if args.results:
+        write_results([result.as_mora_result() for result in results], args.results)
 
 
 if __name__ == "__main__":
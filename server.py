@@ -0,0 +1,93 @@
+"""This file is part of MORA
+
+This runnable script starts a long-running analysis server on localhost, which keeps parsed programs and their
+results warm across requests. See mora/server.py for the endpoints.
+For the command line arguments run the script with "--help".
+"""
+from argparse import ArgumentParser
+from mora.server import AnalysisServer, create_server, DEFAULT_HOST, DEFAULT_PORT, DEFAULT_WORKERS, \
+    DEFAULT_MAX_PROGRAMS
+from mora.cache import SolutionCache, DEFAULT_CACHE_PATH, DEFAULT_CACHE_SIZE
+from mora.utils import set_log_level, LOG_NOTHING
+
+parser = ArgumentParser(description="Run MORA as a server analyzing programs sent over HTTP")
+
+parser.add_argument(
+    "--host",
+    dest="host",
+    type=str,
+    default=DEFAULT_HOST,
+    help=f"The address the server listens on (default {DEFAULT_HOST})"
+)
+
+parser.add_argument(
+    "--port",
+    dest="port",
+    type=int,
+    default=DEFAULT_PORT,
+    help=f"The port the server listens on (default {DEFAULT_PORT})"
+)
+
+parser.add_argument(
+    "--workers",
+    dest="workers",
+    type=int,
+    default=DEFAULT_WORKERS,
+    help="The number of requests analyzed concurrently"
+)
+
+parser.add_argument(
+    "--timeout",
+    dest="timeout",
+    type=float,
+    default=None,
+    help="The default maximal time in seconds a request may take, requests can set their own timeout"
+)
+
+parser.add_argument(
+    "--max_programs",
+    dest="max_programs",
+    type=int,
+    default=DEFAULT_MAX_PROGRAMS,
+    help="The number of programs whose results are kept in memory"
+)
+
+parser.add_argument(
+    "--cache",
+    dest="cache",
+    type=str,
+    nargs="?",
+    const=DEFAULT_CACHE_PATH,
+    default=None,
+    help=f"Additionally cache solutions persistently in the given file (default {DEFAULT_CACHE_PATH})"
+)
+
+parser.add_argument(
+    "--cache_size",
+    dest="cache_size",
+    type=int,
+    default=DEFAULT_CACHE_SIZE,
+    help="The maximal number of entries in the persistent cache before the least recently used ones get evicted"
+)
+
+
+def main():
+    args = parser.parse_args()
+    set_log_level(LOG_NOTHING)
+    cache = SolutionCache(args.cache, args.cache_size) if args.cache else None
+    analysis = AnalysisServer(args.workers, args.timeout, cache, args.max_programs)
+    server = create_server(analysis, args.host, args.port)
+    print(f"Serving on http://{args.host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        analysis.shutdown()
+        if cache is not None:
+            cache.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""This file is part of MORA
+
+This runnable script measures the cold-start latency of run.py on a trivial program, i.e. the time until MORA has
+imported its dependencies and solved a single moment. Every run happens in a fresh interpreter started with
+"-X importtime", such that the slowest imports can be reported as well.
+For the command line arguments run the script with "--help".
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from argparse import ArgumentParser
+from timeit import default_timer as timer
+
+RUN_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "run.py")
+TRIVIAL_PROGRAM = "x = 0\nwhile true:\n    x = x + 1\n"
+
+parser = ArgumentParser(description="Measure the cold-start latency of MORA")
+
+parser.add_argument(
+    "--runs",
+    dest="runs",
+    type=int,
+    default=5,
+    help="The number of fresh interpreters to start per measurement"
+)
+
+parser.add_argument(
+    "--top",
+    dest="top",
+    type=int,
+    default=10,
+    help="The number of slowest imports to report"
+)
+
+parser.add_argument(
+    "--max_time",
+    dest="max_time",
+    type=float,
+    default=None,
+    help="Exit with a non-zero status if the median latency on the trivial program exceeds this many seconds"
+)
+
+parser.add_argument(
+    "--results",
+    dest="results",
+    type=str,
+    default=None,
+    help="A JSON file the measurements get written to"
+)
+
+
+def run_cold(arguments, directory):
+    """
+    Runs run.py with the given arguments in a fresh interpreter and returns the wall time and the import times
+    in seconds by module
+    """
+    start = timer()
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", RUN_SCRIPT] + arguments,
+        cwd=directory, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, universal_newlines=True, check=True
+    )
+    time = timer() - start
+    imports = {}
+    # Lines look like "import time:   self [us] | cumulative | imported package", nesting is given by indentation
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, module = line.split("|")
+        imports[module.strip()] = int(cumulative) / 1e6
+    return time, imports
+
+
+def main():
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as directory:
+        # run.py writes its output files into out/ relative to the working directory
+        os.makedirs(os.path.join(directory, "out"))
+        program = os.path.join(directory, "trivial")
+        with open(program, "w") as file:
+            file.write(TRIVIAL_PROGRAM)
+
+        measurements = {}
+        imports = {}
+        for name, arguments in [("help", ["--help"]), ("trivial", ["--benchmarks", program, "--goals", "1"])]:
+            times = []
+            for _ in range(args.runs):
+                time, imports[name] = run_cold(arguments, directory)
+                times.append(time)
+            measurements[name] = {"median": statistics.median(times), "min": min(times), "max": max(times)}
+            print(f"{name:10} median {measurements[name]['median']:.3f}s, min {measurements[name]['min']:.3f}s")
+
+    top_level = {m: t for m, t in imports["trivial"].items() if "." not in m}
+    slowest = sorted(top_level.items(), key=lambda item: -item[1])[:args.top]
+    print("Slowest top-level imports:")
+    for module, time in slowest:
+        print(f"  {module:30} {time:.3f}s")
+
+    if args.results:
+        with open(args.results, "w") as file:
+            json.dump({"latency": measurements, "imports": dict(slowest)}, file, indent=2)
+
+    if args.max_time is not None and measurements["trivial"]["median"] > args.max_time:
+        print(f"Cold start exceeds {args.max_time}s")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
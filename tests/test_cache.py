@@ -0,0 +1,67 @@
+import os
+import tempfile
+import unittest
+
+from diofant import symbols, simplify
+
+from mora.cache import SolutionCache, program_fingerprint, KIND_SOLUTION
+from mora.core import core
+from mora.utils import set_log_level, LOG_NOTHING
+from tests.test_benchmarks import load_benchmark
+
+
+class TestCache(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        set_log_level(LOG_NOTHING)
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "cache.sqlite")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_solutions_get_reused(self):
+        cache = SolutionCache(self.path)
+        expected = dict(core(load_benchmark("binomial"), None, 2, cache=cache))
+        cache.close()
+
+        cache = SolutionCache(self.path)
+        moments = core(load_benchmark("binomial"), None, 2, cache=cache)
+        x = symbols("x")
+        self.assertEqual(simplify(moments[x**2] - expected[x**2]), 0)
+        self.assertGreater(cache.hits, 0)
+        cache.close()
+
+    def test_fingerprint_depends_on_program(self):
+        self.assertEqual(program_fingerprint(load_benchmark("cc")), program_fingerprint(load_benchmark("cc")))
+        self.assertNotEqual(program_fingerprint(load_benchmark("cc")), program_fingerprint(load_benchmark("cc4")))
+
+    def test_eviction(self):
+        cache = SolutionCache(self.path, max_entries=2)
+        x = symbols("x")
+        for i in range(1, 5):
+            cache.put("program", KIND_SOLUTION, x**i, x + i)
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get("program", KIND_SOLUTION, x))
+        self.assertEqual(cache.get("program", KIND_SOLUTION, x**4), x + 4)
+        cache.close()
+
+    def test_eviction_keeps_recently_used(self):
+        cache = SolutionCache(self.path, max_entries=20)
+        x = symbols("x")
+        for i in range(1, 21):
+            cache.put("program", KIND_SOLUTION, x**i, x + i)
+        # The lookup is only recorded in memory, but still counts for the eviction
+        self.assertEqual(cache.get("program", KIND_SOLUTION, x), x + 1)
+        cache.put("program", KIND_SOLUTION, x**21, x + 21)
+        # A full cache evicts a tenth of its entries at once
+        self.assertEqual(len(cache), 18)
+        self.assertEqual(cache.get("program", KIND_SOLUTION, x), x + 1)
+        self.assertIsNone(cache.get("program", KIND_SOLUTION, x**2))
+        cache.close()
+        cache = SolutionCache(self.path, max_entries=20)
+        self.assertEqual(len(cache), 18)
+        cache.close()
@@ -0,0 +1,35 @@
+import unittest
+
+from diofant import symbols, simplify
+
+from mora.core import core, core_goals
+from mora.utils import set_log_level, LOG_NOTHING
+from tests.test_benchmarks import load_benchmark, prepare_result, prepare_moment
+
+
+class TestGoals(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        set_log_level(LOG_NOTHING)
+
+    def test_binomial_all_goals(self):
+        moments = core_goals(load_benchmark("binomial"), [1, 2, 3])
+        x = symbols("x")
+
+        self.assertEqual(list(moments.keys()), [1, 2, 3])
+        self.assertEqual(list(moments[1]), [x])
+        self.assertEqual(simplify(prepare_moment(moments[1][x]) - prepare_result("n*p")), 0)
+        result = prepare_result("p**2*n**2 - p**2*n + p*n")
+        self.assertEqual(simplify(prepare_moment(moments[2][x**2]) - result), 0)
+        result = prepare_result("p**3*n**3 - 3*p**3*n**2 + 2*p**3*n + 3*p**2*n**2 - 3*p**2*n + p*n")
+        self.assertEqual(simplify(prepare_moment(moments[3][x**3]) - result), 0)
+
+    def test_same_as_separate_goals(self):
+        moments = core_goals(load_benchmark("random_walk_2d"), [3, 1])
+        for goal in [1, 3]:
+            expected = dict(core(load_benchmark("random_walk_2d"), None, goal))
+            # Moments which only other goals needed are not part of the result of a goal
+            self.assertEqual(set(moments[goal]), set(expected))
+            for monomial, solution in expected.items():
+                self.assertEqual(simplify(moments[goal][monomial] - solution), 0)
@@ -0,0 +1,77 @@
+import unittest
+
+from diofant import symbols, simplify
+
+from mora.core import core, current_session
+from mora.input import InputParser
+from mora.utils import set_log_level, LOG_NOTHING
+
+SOURCE = """h = 0
+x = 0
+y = 0
+while true:
+    h = 1 @ 1/2; 0
+    x = x-h @ 1/2; x + h
+    y = y+(1-h) @ 1/2; y-(1-h)
+"""
+
+
+def parse(source):
+    parser = InputParser()
+    parser.set_source(source)
+    return parser.parse_source()
+
+
+def solved_monomials(program):
+    """
+    Returns the monomials solved in the current session, excluding reused ones
+    """
+    return {m.as_expr(program.variables) for m in current_session().solution_times}
+
+
+class TestIncremental(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        set_log_level(LOG_NOTHING)
+
+    def run_incremental(self, edited):
+        core(parse(SOURCE), None, 2)
+        program = parse(edited)
+        moments = dict(core(program, None, 2, incremental=True))
+        solved = solved_monomials(program)
+        expected = dict(core(parse(edited), None, 2))
+        self.assertEqual(moments.keys(), expected.keys())
+        for monomial, moment in expected.items():
+            self.assertEqual(simplify(moments[monomial] - moment), 0)
+        return solved
+
+    def test_only_affected_monomials_solved(self):
+        h, x, y = symbols("h x y")
+        solved = self.run_incremental(SOURCE.replace("y = y+(1-h) @ 1/2", "y = y+2*(1-h) @ 1/2"))
+        self.assertIn(y**2, solved)
+        self.assertNotIn(x**2, solved)
+        self.assertNotIn(h, solved)
+
+    def test_ancestor_change_affects_descendants(self):
+        h, x, y = symbols("h x y")
+        solved = self.run_incremental(SOURCE.replace("h = 1 @ 1/2", "h = 1 @ 1/3"))
+        self.assertTrue({h, x**2, y**2} <= solved)
+
+    def test_new_variable(self):
+        z = symbols("z")
+        solved = self.run_incremental(SOURCE.replace("while true:\n", "z = 3\nwhile true:\n    z = z + 1\n"))
+        self.assertEqual(solved, {z, z**2})
+
+    def test_order_of_updates(self):
+        solved = self.run_incremental(SOURCE.replace(
+            "    x = x-h @ 1/2; x + h\n    y = y+(1-h) @ 1/2; y-(1-h)\n",
+            "    y = y+(1-h) @ 1/2; y-(1-h)\n    x = x-h @ 1/2; x + h\n"
+        ))
+        self.assertNotIn(symbols("x")**2, solved)
+
+    def test_not_incremental(self):
+        core(parse(SOURCE), None, 2)
+        program = parse(SOURCE)
+        core(program, None, 2)
+        self.assertIn(symbols("x")**2, solved_monomials(program))
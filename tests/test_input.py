@@ -0,0 +1,45 @@
+import os
+import tempfile
+import unittest
+
+from diofant import symbols
+
+from mora.input import InputParser, get_lark_parser
+from mora.utils import variable_mask, all_are_independent_from_all
+
+
+class TestInput(unittest.TestCase):
+
+    def test_parser_is_shared(self):
+        self.assertIs(get_lark_parser(), get_lark_parser())
+
+    def test_parse_from_other_directory(self):
+        path = os.path.abspath("tests/benchmarks/binomial")
+        cwd = os.getcwd()
+        with tempfile.TemporaryDirectory() as directory:
+            os.chdir(directory)
+            try:
+                parser = InputParser()
+                parser.set_source(path)
+                program = parser.parse_source()
+            finally:
+                os.chdir(cwd)
+        self.assertEqual(program.variables, [symbols("x")])
+
+    def test_comments_and_blank_lines(self):
+        parser = InputParser()
+        parser.set_source("# comment\nx = 0\n\nwhile true:\n    # comment\n    x = x + 1 @ 1/2; x\n\n    y = y + x\n")
+        program = parser.parse_source()
+        self.assertEqual(program.variables, list(symbols("x, y")))
+
+    def test_dependencies(self):
+        parser = InputParser()
+        parser.set_source("while true:\n    a = 1 @ 1/2; 0\n    x = x + a\n    y = y + x\n    z = z + 1\n")
+        program = parser.parse_source()
+        a, x, y, z = symbols("a, x, y, z")
+
+        self.assertEqual(program.ancestors[y], variable_mask(program, [a, x, y]))
+        self.assertEqual(program.dependencies[x], variable_mask(program, [x, y]))
+        self.assertTrue(all_are_independent_from_all(program, [z], [x, y]))
+        self.assertTrue(all_are_independent_from_all(program, [a], [x]))
+        self.assertFalse(all_are_independent_from_all(program, [y, z], [x]))
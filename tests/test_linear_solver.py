@@ -0,0 +1,75 @@
+import unittest
+
+from diofant import simplify, expand, log, symbols, Rational
+
+from mora.core import core, SOLVER_LINEAR, SOLVER_SUMMATION
+from mora.exppoly import to_exppoly, sum_recurrence, power_sum, n
+from mora.utils import set_log_level, LOG_NOTHING
+from mora.input import sympify
+from tests.test_benchmarks import load_benchmark
+
+
+class TestLinearSolver(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        set_log_level(LOG_NOTHING)
+
+    def assert_same_solutions(self, benchmark, goal):
+        expected = dict(core(load_benchmark(benchmark), None, goal, SOLVER_SUMMATION))
+        actual = dict(core(load_benchmark(benchmark), None, goal, SOLVER_LINEAR))
+        self.assertEqual(expected.keys(), actual.keys())
+        for monomial in expected:
+            self.assertEqual(simplify(expand(expected[monomial] - actual[monomial])), 0)
+
+    def test_resonant_recurrence(self):
+        # f(n+1) = 2*f(n) + 2^n, f(0) = 1
+        solution = sum_recurrence(sympify(2), to_exppoly(2**n), sympify(1))
+        self.assertEqual(simplify(solution.as_expr() - (2**n + n * 2**(n-1))), 0)
+
+    def test_polynomial_recurrence(self):
+        # f(n+1) = f(n) + n^2, f(0) = 3
+        solution = sum_recurrence(sympify(1), to_exppoly(n**2), sympify(3))
+        self.assertEqual(simplify(solution.as_expr() - (3 + (n-1)*n*(2*n-1)/6)), 0)
+
+    def test_power_sum_table(self):
+        # sum of k^2 over k = 0, ..., n-1
+        table = power_sum(2, True)
+        self.assertEqual(table, {3: Rational(1, 3), 2: Rational(-1, 2), 1: Rational(1, 6)})
+
+    def test_sum_recurrence(self):
+        p, q = symbols("p q")
+        cases = [
+            (Rational(1, 2), n**2 * 3**n + 5, 2),
+            (p, n * p**n + q * n**3, q),
+            (sympify(1), n**2 + n * 2**n, 0),
+            (sympify(0), n * q**n, 1),
+        ]
+        for recurr_coeff, inhom_part, initial_value in cases:
+            solution = sum_recurrence(recurr_coeff, to_exppoly(inhom_part), sympify(initial_value)).as_expr()
+            # Compare against iterating the recurrence for n = 1, ..., 5
+            expected = sympify(initial_value)
+            for i in range(1, 6):
+                expected = recurr_coeff * expected + inhom_part.subs({n: i - 1})
+                self.assertEqual(simplify(solution.subs({n: i}) - expected), 0)
+
+    def test_not_exppoly(self):
+        self.assertIsNone(to_exppoly(log(n) * 2**n))
+
+    def test_binomial(self):
+        for goal in [1, 2, 3]:
+            self.assert_same_solutions("binomial", goal)
+
+    def test_cc4(self):
+        for goal in [1, 2, 3]:
+            self.assert_same_solutions("cc4", goal)
+
+    def test_random_walk_1d_cts(self):
+        for goal in [1, 2, 3]:
+            self.assert_same_solutions("random_walk_1d_cts", goal)
+
+    def test_stuttering_p(self):
+        self.assert_same_solutions("stuttering_p", 2)
+
+    def test_test_init_rv(self):
+        self.assert_same_solutions("test_init_rv", 3)
@@ -0,0 +1,47 @@
+import unittest
+
+from diofant import symbols, Rational
+
+from mora.core import core
+from mora.input import InputParser
+from mora.utils import RandomVar, stirling_numbers
+
+
+class TestMoments(unittest.TestCase):
+
+    def test_gauss_symbolic(self):
+        mu, s = symbols("mu s")
+        gauss = RandomVar("gauss", [mu, s])
+        self.assertEqual(gauss.compute_moment(4), mu**4 + 6*mu**2*s + 3*s**2)
+        self.assertEqual(gauss.compute_moment(5), mu**5 + 10*mu**3*s + 15*mu*s**2)
+        self.assertEqual(RandomVar("normal", [0, 1]).compute_moment(10), 945)
+
+    def test_exact_moments(self):
+        n, p, rate = symbols("n p l")
+        self.assertEqual(RandomVar("uniform", [0, 1]).compute_moment(3), Rational(1, 4))
+        self.assertEqual(RandomVar("bernoulli", [p]).compute_moment(7), p)
+        self.assertEqual(RandomVar("binomial", [n, p]).compute_moment(2), n*p - n*p**2 + n**2*p**2)
+        self.assertEqual(RandomVar("binomial", [3, Rational(1, 2)]).compute_moment(3), Rational(27, 4))
+        self.assertEqual(RandomVar("poisson", [rate]).compute_moment(3), rate**3 + 3*rate**2 + rate)
+        self.assertEqual(RandomVar("exponential", [2]).compute_moment(3), Rational(3, 4))
+        self.assertEqual(RandomVar("gamma", [2, 3]).compute_moment(2), 54)
+        self.assertEqual(RandomVar("beta", [1, 1]).compute_moment(2), Rational(1, 3))
+        self.assertEqual(RandomVar("laplace", [0, 1]).compute_moment(4), 24)
+        self.assertEqual(stirling_numbers(4), (0, 1, 7, 6, 1))
+
+    def test_moment_cache(self):
+        gauss = RandomVar("gauss", [0, 1])
+        gauss.compute_moment(6)
+        self.assertEqual(set(gauss.moments), {2, 3, 4, 5, 1, 6})
+        self.assertIs(gauss.compute_moment(6), gauss.moments[6])
+
+    def test_unsupported_distribution(self):
+        with self.assertRaises(Exception):
+            RandomVar("cauchy", [0, 1])
+
+    def test_program_with_new_distribution(self):
+        parser = InputParser()
+        parser.set_source("x = 0\nwhile true:\n    p = RV(poisson, 2)\n    x = x + p\n")
+        program = parser.parse_source()
+        moments = core(program, None, 1)
+        self.assertEqual(moments[symbols("x")], 2*symbols("n", integer=True, positive=True))
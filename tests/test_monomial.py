@@ -0,0 +1,39 @@
+import gc
+import pickle
+import unittest
+
+from diofant import symbols, sympify
+
+from mora.utils import Monomial, expr_to_terms, terms_to_expr
+
+
+class TestMonomial(unittest.TestCase):
+
+    def test_equality_and_hash(self):
+        self.assertEqual(Monomial((1, 2)), Monomial([1, 2]))
+        self.assertNotEqual(Monomial((1, 2)), Monomial((2, 1)))
+        self.assertEqual(len({Monomial((1, 2)), Monomial((1, 2)), Monomial((0, 0))}), 2)
+
+    def test_interning(self):
+        self.assertIs(Monomial((1, 2)), Monomial([1, 2]))
+        self.assertIs(pickle.loads(pickle.dumps(Monomial((3, 0)))), Monomial((3, 0)))
+        # Monomials which are no longer referenced get removed from the intern table
+        Monomial((7, 7))
+        gc.collect()
+        self.assertNotIn((7, 7), Monomial.interned)
+
+    def test_as_expr(self):
+        x, y = symbols("x y")
+        self.assertEqual(Monomial((2, 1)).as_expr([x, y]), x**2 * y)
+        self.assertTrue(Monomial.constant(2).is_constant())
+        self.assertEqual(Monomial.constant(2).as_expr([x, y]), 1)
+        self.assertEqual(Monomial((2, 1)).as_expr([y, x]), y**2 * x)
+
+    def test_terms_round_trip(self):
+        x, y, p = symbols("x y p")
+        expression = p*x**2*y + 3*y + sympify(1)/2
+        terms = expr_to_terms(expression, [x, y])
+        self.assertEqual(terms[Monomial((2, 1))], p)
+        self.assertEqual(terms[Monomial((0, 1))], 3)
+        self.assertEqual(terms_to_expr(terms, [x, y]), expression)
+
@@ -0,0 +1,79 @@
+import unittest
+from fractions import Fraction
+
+import numpy
+from diofant import symbols
+
+from mora.core import core
+from mora.numeric import numeric_moments, MissingParameters, MomentEvaluator
+from tests.test_benchmarks import load_benchmark
+
+
+class TestNumeric(unittest.TestCase):
+
+    def assert_matches_closed_forms(self, name, goal, parameters):
+        program = load_benchmark(name)
+        closed_forms = core(program, None, goal)
+        moments = numeric_moments(program, None, goal, 20, parameters)
+        for monomial, values in moments.items():
+            solution = closed_forms[monomial]
+            for n in [1, 7, 20]:
+                replacements = {s: n if s.name == "n" else parameters[s.name] for s in solution.free_symbols}
+                self.assertAlmostEqual(float(solution.xreplace(replacements)), values[n], places=6)
+
+    def test_binomial(self):
+        self.assert_matches_closed_forms("binomial", 3, {"p": 0.3})
+
+    def test_stuttering_with_placeholders(self):
+        self.assert_matches_closed_forms("stuttering_a", 2, {"d": 0.5})
+
+    def test_exact(self):
+        program = load_benchmark("binomial")
+        x = symbols("x")
+        moments = numeric_moments(program, None, 2, 10, {"p": "1/3"}, exact=True)
+        self.assertEqual(moments[x][9], Fraction(3))
+        self.assertEqual(moments[x**2][3], Fraction(3) * Fraction(1, 3) * Fraction(2, 3) + 1)
+
+    def test_parameter_sweep(self):
+        program = load_benchmark("binomial")
+        x = symbols("x")
+        p = numpy.array([0.0, 0.5, 1.0])
+        moments = numeric_moments(program, None, 1, 100, {"p": p})
+        self.assertEqual(moments[x].shape, (101, 3))
+        numpy.testing.assert_allclose(moments[x][100], 100 * p)
+
+    def test_missing_parameters(self):
+        program = load_benchmark("binomial")
+        with self.assertRaises(MissingParameters):
+            numeric_moments(program, None, 1, 10, {})
+
+
+class TestMomentEvaluator(unittest.TestCase):
+
+    def test_grid(self):
+        program = load_benchmark("binomial")
+        x = symbols("x")
+        evaluator = MomentEvaluator(core(program, None, 2))
+        self.assertEqual(evaluator.parameters, ["n", "p"])
+        n = numpy.arange(1, 101)[:, None]
+        p = numpy.linspace(0, 1, 11)[None, :]
+        moments = evaluator.evaluate({"n": n, "p": p})
+        self.assertEqual(moments[x**2].shape, (100, 11))
+        numpy.testing.assert_allclose(moments[x], n * p)
+        numpy.testing.assert_allclose(moments[x**2], n * p * (1 - p) + (n * p)**2)
+
+    def test_shared_subexpressions(self):
+        program = load_benchmark("stuttering_a")
+        closed_forms = core(program, None, 2)
+        evaluator = MomentEvaluator(closed_forms)
+        self.assertGreater(len(evaluator.steps), 0)
+        moments = evaluator.evaluate({"n": [3, 8], "d": 0.5})
+        for monomial, solution in closed_forms.items():
+            for i, n in enumerate([3, 8]):
+                replacements = {s: n if s.name == "n" else 0.5 for s in solution.free_symbols}
+                self.assertAlmostEqual(float(solution.xreplace(replacements)), moments[monomial][i], places=6)
+
+    def test_missing_parameters(self):
+        evaluator = MomentEvaluator(core(load_benchmark("binomial"), None, 1))
+        with self.assertRaises(MissingParameters):
+            evaluator.evaluate({"n": 1})
@@ -0,0 +1,33 @@
+import unittest
+
+from diofant import simplify
+
+from mora.core import core, SOLVER_LINEAR, SOLVER_SUMMATION
+from mora.utils import set_log_level, LOG_NOTHING
+from tests.test_benchmarks import load_benchmark
+
+
+class TestParallel(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        set_log_level(LOG_NOTHING)
+
+    def assert_same_as_sequential(self, benchmark, goal, solver=SOLVER_SUMMATION):
+        expected = dict(core(load_benchmark(benchmark), None, goal, solver))
+        actual = dict(core(load_benchmark(benchmark), None, goal, solver, jobs=2))
+        self.assertEqual(set(expected.keys()), set(actual.keys()))
+        for monomial in expected:
+            self.assertEqual(simplify(expected[monomial] - actual[monomial]), 0)
+
+    def test_cc4(self):
+        self.assert_same_as_sequential("cc4", 2)
+
+    def test_running(self):
+        self.assert_same_as_sequential("running", 2)
+
+    def test_test_init_rv(self):
+        self.assert_same_as_sequential("test_init_rv", 2, SOLVER_LINEAR)
+
+    def test_random_walk_2d(self):
+        self.assert_same_as_sequential("random_walk_2d", 3, SOLVER_LINEAR)
@@ -0,0 +1,48 @@
+import unittest
+
+from diofant import symbols
+
+from mora.core import start_session, plan_goals, solve_goals
+from mora.plan import PlanLimitExceeded
+from mora.utils import set_log_level, LOG_NOTHING
+from tests.test_benchmarks import load_benchmark
+
+
+class TestPlan(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        set_log_level(LOG_NOTHING)
+
+    def test_closure_of_goal(self):
+        program = load_benchmark("random_walk_2d")
+        start_session(program)
+        plan = plan_goals(program, None, 2)
+        moments = solve_goals(program, None, 2)
+        self.assertEqual({m.as_expr(program.variables) for m in plan.dependencies}, set(moments.keys()))
+        self.assertEqual(plan.size, len(moments))
+        self.assertEqual(plan.cost, sum(plan.terms.values()))
+
+    def test_order_is_topological(self):
+        program = load_benchmark("stuttering_c")
+        start_session(program)
+        plan = plan_goals(program, None, 2)
+        self.assertEqual(set(plan.order), set(plan.dependencies))
+        position = {m: i for i, m in enumerate(plan.order)}
+        for m, dependencies in plan.dependencies.items():
+            for dependency in dependencies:
+                self.assertLess(position[dependency], position[m])
+
+    def test_binomial_estimate(self):
+        program = load_benchmark("binomial")
+        start_session(program)
+        plan = plan_goals(program, [symbols("x")**3])
+        self.assertEqual(plan.size, 3)
+        self.assertEqual(plan.max_degree(), 3)
+        self.assertEqual(plan.as_dict()["order"], ["x", "x**2", "x**3"])
+
+    def test_limit(self):
+        program = load_benchmark("stuttering_c")
+        start_session(program)
+        with self.assertRaises(PlanLimitExceeded):
+            plan_goals(program, None, 2, max_monomials=5)
@@ -0,0 +1,49 @@
+import unittest
+
+from mora.core import core
+from mora.profiler import start_profiling, stop_profiling, is_profiling
+from tests.test_benchmarks import load_benchmark
+
+
+class TestProfiler(unittest.TestCase):
+
+    def tearDown(self):
+        stop_profiling()
+
+    def test_phases_per_monomial(self):
+        program = load_benchmark("binomial")
+        start_profiling()
+        core(program, None, 2)
+        profile = stop_profiling().as_dict()
+        self.assertFalse(is_profiling())
+
+        self.assertIn("x**2", profile["monomials"])
+        phases = profile["monomials"]["x**2"]
+        for name in ["get_solution", "compute_recurrence", "presolve_independent_occurences", "sum_recurrence"]:
+            self.assertIn(name, phases)
+            self.assertGreater(phases[name]["calls"], 0)
+        self.assertGreater(phases["compute_recurrence"]["size_max"], 0)
+        for store in ["solution_store", "recurrence_store"]:
+            self.assertGreater(profile["stores"][store]["misses"], 0)
+            self.assertTrue(0 <= profile["stores"][store]["hit_rate"] <= 1)
+
+    def test_interning_hit_rates(self):
+        program = load_benchmark("stuttering_a")
+        start_profiling()
+        core(program, None, 2)
+        stores = stop_profiling().as_dict()["stores"]
+        for store in ["monomial_exprs", "placeholder_symbols", "shifted_solution_store"]:
+            self.assertGreater(stores[store]["hits"], 0)
+            self.assertTrue(0 <= stores[store]["hit_rate"] <= 1)
+
+    def test_folded_stacks(self):
+        program = load_benchmark("binomial")
+        profiler = start_profiling()
+        core(program, None, 2)
+        stop_profiling()
+        lines = profiler.folded_stacks()
+        self.assertIn("get_solution:E[x**2];compute_recurrence", "\n".join(lines))
+        for line in lines:
+            stack, count = line.rsplit(" ", 1)
+            self.assertNotIn(" ", stack)
+            self.assertGreaterEqual(int(count), 0)
@@ -0,0 +1,42 @@
+import os
+import tempfile
+import unittest
+
+from diofant import symbols, sympify
+
+from mora.mora import mora, mora_goals
+from mora.output import MoraResult, write_results, read_results
+from tests.test_benchmarks import prepare_moment
+
+
+class TestResults(unittest.TestCase):
+
+    def test_structured_result(self):
+        result = mora("tests/benchmarks/binomial", goal=2, structured=True)
+        self.assertIsInstance(result, MoraResult)
+        self.assertTrue(result.ok)
+        self.assertEqual(result.benchmark, "binomial")
+        x = symbols("x")
+        self.assertEqual(prepare_moment(result.moments[x]), sympify("n*p"))
+        self.assertEqual(set(result.monomial_stats), {x, x**2})
+        self.assertGreaterEqual(result.monomial_stats[x**2]["time"], 0)
+        self.assertGreater(result.monomial_stats[x**2]["recurrence_terms"], 0)
+
+    def test_structured_error(self):
+        result = mora("x = 0\nwhile true:\n    x = x**2", goal=1, structured=True)
+        self.assertFalse(result.ok)
+        self.assertEqual(result.moments, {})
+        results = mora_goals("not a program", goals=(1, 2), structured=True)
+        self.assertEqual([r.ok for r in results.values()], [False, False])
+
+    def test_serializers(self):
+        # The unknown initial value y(0) cannot be pickled directly
+        results = list(mora_goals("tests/benchmarks/running", goals=(1, 2), structured=True).values())
+        with tempfile.TemporaryDirectory() as directory:
+            for name in ["results.json", "results.pickle"]:
+                path = os.path.join(directory, name)
+                write_results(results, path)
+                loaded = read_results(path)
+                self.assertEqual([r.goal for r in loaded], [1, 2])
+                self.assertEqual(loaded[1].moments, results[1].moments)
+                self.assertEqual(loaded[1].monomial_stats, results[1].monomial_stats)
@@ -0,0 +1,49 @@
+import multiprocessing
+import time
+import unittest
+from unittest.mock import patch
+
+from diofant import symbols
+
+from mora.runner import run_parallel, STATUS_OK, STATUS_FAILED, STATUS_TIMEOUT
+from mora.mora import mora
+from mora.utils import set_log_level, LOG_NOTHING
+
+HANGING = "hanging"
+
+
+def hanging_mora(source, **kwargs):
+    """
+    Never finishes for the hanging source, such that its task always runs into the timeout
+    """
+    while source == HANGING:
+        time.sleep(1)
+    return mora(source, **kwargs)
+
+
+class TestRunner(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        set_log_level(LOG_NOTHING)
+
+    def test_results_in_task_order(self):
+        tasks = [("tests/benchmarks/binomial", 2), ("tests/benchmarks/binomial", 1), ("tests/benchmarks/geometric", 1)]
+        results = run_parallel(tasks, jobs=2, timeout=60)
+        self.assertEqual([(r.benchmark, r.goal) for r in results], tasks)
+        self.assertTrue(all(r.status == STATUS_OK for r in results))
+        self.assertIn(" E[x] = n*p", results[1].moments)
+        structured = results[1].as_mora_result()
+        self.assertEqual((structured.benchmark, structured.goal, structured.status), ("binomial", 1, STATUS_OK))
+        self.assertEqual(str(structured.moments[symbols("x")]), "n*p")
+        self.assertGreater(structured.peak_memory, 0)
+
+    @unittest.skipUnless(multiprocessing.get_start_method() == "fork", "workers need to inherit the patched mora")
+    def test_failures_do_not_stall(self):
+        tasks = [(HANGING, 1), ("not a program", 1), ("tests/benchmarks/binomial", 1)]
+        with patch("mora.runner.mora", hanging_mora):
+            results = run_parallel(tasks, jobs=2, timeout=1)
+        self.assertEqual([r.status for r in results], [STATUS_TIMEOUT, STATUS_FAILED, STATUS_OK])
+        structured = [r.as_mora_result() for r in results]
+        self.assertEqual([r.status for r in structured], [STATUS_TIMEOUT, STATUS_FAILED, STATUS_OK])
+        self.assertEqual([r.ok for r in structured], [False, False, True])
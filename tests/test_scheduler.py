@@ -0,0 +1,38 @@
+import sys
+import unittest
+
+from mora.core import core
+from mora.input import InputParser
+from mora.utils import set_log_level, LOG_NOTHING
+from tests.test_benchmarks import load_benchmark
+
+
+def parse(source):
+    parser = InputParser()
+    parser.set_source(source)
+    return parser.parse_source()
+
+
+class TestScheduler(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        set_log_level(LOG_NOTHING)
+
+    def test_deep_dependency_chain(self):
+        # Every variable copies the one before, so the moment of the last one depends on a chain through all of them
+        length = sys.getrecursionlimit() // 4
+        source = "\n".join(f"x{i} = 0" for i in range(length)) + "\nwhile true:\n    x0 = x0 + 1 @ 1/2; x0\n"
+        source += "\n".join(f"    x{i} = x{i - 1}" for i in range(1, length)) + "\n"
+        program = parse(source)
+        moments = core(program, [program.variables[-1]])
+        self.assertEqual(len(moments), length)
+
+    def test_growing_monomials(self):
+        with self.assertRaisesRegex(Exception, "not prob-solvable"):
+            core(parse("x = 0\nwhile true:\n    x = x**2 @ 1/2; x + 1\n"))
+
+    def test_order_of_solutions(self):
+        # Dependencies are solved before the monomials depending on them, in depth-first order
+        program = load_benchmark("binomial")
+        self.assertEqual([str(m) for m in core(program, None, 3)], ["x", "x**2", "x**3"])
@@ -0,0 +1,119 @@
+import json
+import threading
+import time
+import unittest
+from urllib.request import Request, urlopen
+
+from mora.core import core_goals, SOLVER_SUMMATION
+from mora.server import AnalysisServer, create_server, STATUS_RUNNING, STATUS_CANCELLED
+from mora.runner import STATUS_OK, STATUS_TIMEOUT, STATUS_FAILED
+from mora.utils import set_log_level, LOG_NOTHING
+from tests.test_benchmarks import load_benchmark
+
+# A program with several monomials to solve, whose session gets a blocking hook after its first solution
+BLOCKED = "x = 0\ny = 0\nwhile true:\n    x = x + 1 @ 1/2; x\n    y = y + x\n"
+
+
+class TestServer(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        set_log_level(LOG_NOTHING)
+
+    def setUp(self):
+        self.analysis = AnalysisServer(workers=2)
+        self.server = create_server(self.analysis, port=0)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.analysis.shutdown()
+
+    def post(self, data: dict) -> dict:
+        request = Request(f"{self.url}/analyze", json.dumps(data).encode(), {"Content-Type": "application/json"})
+        with urlopen(request) as response:
+            return json.loads(response.read())
+
+    def get(self, path: str) -> dict:
+        with urlopen(f"{self.url}{path}") as response:
+            return json.loads(response.read())
+
+    def test_analyze(self):
+        program = load_benchmark("stuttering_a")
+        expected = {str(m): str(e) for m, e in core_goals(program, [1, 2])[2].items()}
+        for _ in range(2):
+            response = self.post({"source": program.source, "goals": [1, 2], "name": "stuttering_a"})
+            self.assertEqual(response["status"], STATUS_OK)
+            self.assertEqual([r["goal"] for r in response["results"]], [1, 2])
+            moments = {m["monomial"]: m["expression"] for m in response["results"][1]["moments"]}
+            self.assertEqual(moments, expected)
+        # The second request reuses the warm session of the first one
+        status = self.get("/status")
+        self.assertEqual((status["session_hits"], status["session_misses"]), (1, 1))
+        self.assertEqual(status["requests"], {STATUS_OK: 2})
+
+    def test_edited_program(self):
+        first = self.analysis.submit("x = 0\ny = 0\nwhile true:\n    x = x + 1\n    y = y + 2\n", [2], "edit")
+        first.future.result()
+        second = self.analysis.submit("x = 0\ny = 0\nwhile true:\n    x = x + 1\n    y = y + 3\n", [2], "edit")
+        second.future.result()
+        self.assertEqual(second.status, STATUS_OK)
+        stats = second.results[0].monomial_stats
+        # Only the moments of the edited variable get solved again
+        self.assertEqual({str(m) for m, s in stats.items() if s["time"] > 0}, {"y", "y**2"})
+
+    def test_busy_previous_program(self):
+        first = self.analysis.submit("x = 0\nwhile true:\n    x = x + 1\n", [1], "busy")
+        first.future.result()
+        previous, _ = self.analysis.get_session("x = 0\nwhile true:\n    x = x + 1\n", "busy", SOLVER_SUMMATION)
+        # While the previous version is analyzed elsewhere, the edited one starts from scratch instead of waiting
+        with previous:
+            second = self.analysis.submit("x = 0\nwhile true:\n    x = x + 2\n", [1], "busy", timeout=5)
+            second.future.result(timeout=5)
+        self.assertEqual(second.status, STATUS_OK)
+
+    def block_after_first_solution(self, release: threading.Event) -> threading.Event:
+        """
+        Makes the warm session of the blocked program wait for the release after its first solution, such that its
+        analysis never finishes on its own. Returns the event which gets set once the analysis is blocked.
+        """
+        blocked = threading.Event()
+        # A failing test must not leave the worker blocked, as shutting down the server waits for it
+        self.addCleanup(release.set)
+        session, _ = self.analysis.get_session(BLOCKED, "from_text", SOLVER_SUMMATION)
+
+        def on_solution(monomial, solution):
+            blocked.set()
+            release.wait()
+        session.on_solution = on_solution
+        return blocked
+
+    def test_poll_and_cancel(self):
+        release = threading.Event()
+        blocked = self.block_after_first_solution(release)
+        response = self.post({"source": BLOCKED, "goals": [2], "wait": False})
+        path = f"/requests/{response['id']}"
+        self.assertTrue(blocked.wait(10))
+        self.assertEqual(self.get(path)["status"], STATUS_RUNNING)
+        with urlopen(Request(f"{self.url}{path}", method="DELETE")) as answer:
+            self.assertEqual(json.loads(answer.read())["id"], response["id"])
+        release.set()
+        self.analysis.get(response["id"]).future.result()
+        self.assertEqual(self.get(path)["status"], STATUS_CANCELLED)
+
+    def test_timeout_and_errors(self):
+        release = threading.Event()
+        blocked = self.block_after_first_solution(release)
+        request = self.analysis.submit(BLOCKED, [2], timeout=0.2)
+        self.assertTrue(blocked.wait(10))
+        # The analysis stays blocked until the timeout has certainly expired
+        time.sleep(0.3)
+        release.set()
+        request.future.result()
+        self.assertEqual(request.status, STATUS_TIMEOUT)
+        request = self.analysis.submit("x = 0\nwhile true:\n    x = x**2 @ 1/2; x + 1\n", [1])
+        request.future.result()
+        self.assertEqual(request.status, STATUS_FAILED)
+        self.assertIn("not prob-solvable", request.error)
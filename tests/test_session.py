@@ -0,0 +1,74 @@
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from mora.core import core, Session, AnalysisCancelled, start_session, solve_goals, current_session
+from mora.utils import set_log_level, LOG_NOTHING
+from tests.test_benchmarks import load_benchmark
+
+BENCHMARKS = ["binomial", "stuttering_a", "running", "cc4"]
+
+
+class TestSession(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        set_log_level(LOG_NOTHING)
+
+    def test_parallel_threads(self):
+        expected = {b: core(load_benchmark(b), None, 2) for b in BENCHMARKS}
+
+        def analyze(benchmark):
+            return Session(load_benchmark(benchmark)).solve_goals(None, 2)
+
+        # Every benchmark runs twice, concurrently with itself and with the others
+        with ThreadPoolExecutor(len(BENCHMARKS)) as pool:
+            actual = list(pool.map(analyze, BENCHMARKS * 2))
+        self.assertEqual(actual, [expected[b] for b in BENCHMARKS * 2])
+
+    def test_keep_session(self):
+        session = Session(load_benchmark("binomial"))
+        first = session.solve_goals(None, 2)
+        # Solving other programs in between does not touch the kept session
+        core(load_benchmark("running"), None, 2)
+        self.assertEqual(session.solve_goals(None, 2), first)
+        self.assertEqual(set(session.get_monomial_stats()), set(first))
+        self.assertEqual(len(session.solution_store), len(first))
+
+    def test_nested_sessions(self):
+        program = load_benchmark("running")
+        started = start_session(program)
+        inner = Session(load_benchmark("binomial"))
+        with inner:
+            self.assertIs(current_session(), inner)
+            inner_solutions = solve_goals(inner.program, None, 1)
+        self.assertIs(current_session(), started)
+        solutions = solve_goals(program, None, 1)
+        self.assertEqual(set(solutions), set(core(program, None, 1)))
+        self.assertTrue(set(inner_solutions).isdisjoint(started.solution_store))
+
+    def test_update(self):
+        session = Session(load_benchmark("stuttering_a"))
+        session.solve_goals(None, 2)
+        updated = session.update(load_benchmark("stuttering_a"))
+        self.assertEqual(set(updated.solution_store), set(session.solution_store))
+        self.assertEqual(updated.solve_goals(None, 2), session.solve_goals(None, 2))
+
+    def test_on_solution(self):
+        session = Session(load_benchmark("stuttering_a"))
+        solved = []
+        session.on_solution = lambda monomial, solution: solved.append((monomial, solution))
+        solutions = session.solve_goals(None, 2)
+        self.assertEqual(dict(solved), solutions)
+
+    def test_cancel(self):
+        session = Session(load_benchmark("stuttering_a"))
+        cancel_event = threading.Event()
+        # Cancel as soon as the first monomial is solved
+        session.on_solution = lambda monomial, solution: cancel_event.set()
+        with self.assertRaises(AnalysisCancelled):
+            session.solve_goals(None, 2, cancel_event=cancel_event)
+        self.assertEqual(len(session.solution_store), 1)
+        # The session stays usable and keeps the solved monomial
+        session.on_solution = None
+        self.assertEqual(session.solve_goals(None, 2), core(load_benchmark("stuttering_a"), None, 2))
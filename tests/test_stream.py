@@ -0,0 +1,76 @@
+import json
+import os
+import tempfile
+import unittest
+
+from diofant import symbols
+
+from mora.core import core
+from mora.output import ResultStream
+from tests.test_benchmarks import load_benchmark
+
+
+class TestResultStream(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "results.jsonl")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def read_records(self):
+        records = []
+        with open(self.path) as file:
+            for line in file:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    continue
+        return records
+
+    def test_one_line_per_monomial(self):
+        stream = ResultStream(self.path)
+        core(load_benchmark("binomial"), None, 2, stream=stream)
+        records = self.read_records()
+        stream.close()
+        self.assertEqual([r["monomial"] for r in records], ["x", "x**2"])
+        self.assertEqual(records[0]["benchmark"], "binomial")
+        self.assertEqual(records[0]["expression"], "n*p")
+        self.assertTrue(all(r["time"] >= 0 for r in records))
+
+    def test_lines_are_written_before_close(self):
+        stream = ResultStream(self.path)
+        core(load_benchmark("binomial"), None, 1, stream=stream)
+        # The run may get killed while solving the next monomial, the solved ones must already be in the file
+        self.assertEqual([r["monomial"] for r in self.read_records()], ["x"])
+        core(load_benchmark("binomial"), None, 2, stream=stream)
+        self.assertEqual([r["monomial"] for r in self.read_records()], ["x", "x**2"])
+        stream.close()
+
+    def test_resume_skips_recorded_monomials(self):
+        program = load_benchmark("binomial")
+        stream = ResultStream(self.path)
+        first = core(program, None, 2, stream=stream)
+        stream.close()
+
+        stream = ResultStream(self.path, resume=True)
+        second = core(program, None, 3, stream=stream)
+        stream.close()
+        self.assertEqual([r["monomial"] for r in self.read_records()], ["x", "x**2", "x**3"])
+        x = symbols("x")
+        self.assertEqual(first[x**2], second[x**2])
+
+    def test_resume_after_incomplete_line(self):
+        stream = ResultStream(self.path)
+        core(load_benchmark("binomial"), None, 1, stream=stream)
+        stream.close()
+        with open(self.path, "a") as file:
+            file.write('{"benchmark": "binom')
+
+        stream = ResultStream(self.path, resume=True)
+        core(load_benchmark("binomial"), None, 2, stream=stream)
+        stream.close()
+        self.assertEqual([r["monomial"] for r in self.read_records()], ["x", "x**2"])
+        with open(self.path) as file:
+            self.assertEqual(len(file.readlines()), 3)
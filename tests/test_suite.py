@@ -0,0 +1,35 @@
+import unittest
+
+from mora.runner import STATUS_OK, STATUS_TIMEOUT
+from mora.suite import run_suite, compare_to_baseline
+
+
+def entry(time, status=STATUS_OK, peak_memory=100.0):
+    return {"status": status, "time": time, "peak_memory": peak_memory, "monomials": 1, "error": ""}
+
+
+class TestSuite(unittest.TestCase):
+
+    def test_run_suite(self):
+        # Memory of the suite itself is inherited by the forked workers but must not count for the tasks
+        ballast = bytearray(b"x") * (200 * 1024 * 1024)
+        results = run_suite(["tests/benchmarks/binomial"], [1, 2], memory_limit=150)
+        del ballast
+        self.assertEqual(list(results.keys()), ["binomial:1", "binomial:2"])
+        self.assertEqual(results["binomial:2"]["status"], STATUS_OK)
+        self.assertEqual(results["binomial:2"]["monomials"], 2)
+        self.assertTrue(0 < results["binomial:2"]["peak_memory"] < 100)
+
+    def test_compare_flags_slowdowns(self):
+        baseline = {"a:1": entry(2.0), "b:1": entry(0.1), "c:1": entry(2.0)}
+        results = {"a:1": entry(3.0), "b:1": entry(0.3), "c:1": entry(2.2)}
+        regressions = compare_to_baseline(baseline, results, threshold=0.25, min_time=0.5)
+        self.assertEqual([(r.key, r.kind) for r in regressions], [("a:1", "time")])
+
+    def test_compare_flags_failures_and_memory(self):
+        baseline = {"a:1": entry(1.0), "b:1": entry(1.0), "c:1": entry(1.0, STATUS_TIMEOUT),
+                    "d:1": entry(1.0, peak_memory=2.0)}
+        results = {"a:1": entry(1.0, STATUS_TIMEOUT), "b:1": entry(1.0, peak_memory=200.0), "c:1": entry(1.0),
+                   "d:1": entry(1.0, peak_memory=4.0)}
+        regressions = compare_to_baseline(baseline, results)
+        self.assertEqual([(r.key, r.kind) for r in regressions], [("a:1", "status"), ("b:1", "peak_memory")])